@@ -0,0 +1,161 @@
+# analytics.py
+"""Incremental rolling statistics and risk-regime alerts.
+
+Every tracked series (each indicator, each composite sub-score and the
+composite itself) gets a RollingStat fed one dated observation at a time:
+a new date appends to a fixed window, a repeated date revises the latest
+point in place. Mean and variance come from running sums, percentiles from
+a sorted copy of the window, and the EWMA from the previous EWMA state, so
+an update never rescans the history.
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import datetime
+from math import sqrt
+
+WINDOW = 252  # about one year of daily observations
+EWMA_HALFLIFE = 20
+REGIME_HYSTERESIS = 1.0  # score points beyond a band edge before a transition counts
+MAX_ALERTS = 50
+
+
+class RollingStat:
+    def __init__(self, window=WINDOW, halflife=EWMA_HALFLIFE):
+        self.window = window
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.values = deque()
+        self.sorted = []
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.last_date = None
+        self.ewma = None
+        self.ewvar = 0.0
+        self._ewm_before_last = (None, 0.0)
+
+    def observe(self, date, value):
+        """Add an observation; returns False for one older than the latest."""
+        value = float(value)
+        if self.last_date is not None and date < self.last_date:
+            return False
+        if date == self.last_date:
+            self._remove(self.values.pop())
+            self.ewma, self.ewvar = self._ewm_before_last
+        elif len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(value)
+        insort(self.sorted, value)
+        self.total += value
+        self.total_sq += value * value
+        self.last_date = date
+
+        self._ewm_before_last = (self.ewma, self.ewvar)
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            delta = value - self.ewma
+            self.ewma += self.alpha * delta
+            self.ewvar = (1 - self.alpha) * (self.ewvar + self.alpha * delta * delta)
+        return True
+
+    def _remove(self, value):
+        del self.sorted[bisect_left(self.sorted, value)]
+        self.total -= value
+        self.total_sq -= value * value
+
+    def summary(self):
+        n = len(self.values)
+        if not n:
+            return None
+        latest = self.values[-1]
+        mean = self.total / n
+        std = sqrt(max(0.0, self.total_sq / n - mean * mean))
+        rank = (bisect_left(self.sorted, latest) + bisect_right(self.sorted, latest)) / 2
+        return {
+            "value": latest,
+            "date": self.last_date.isoformat(),
+            "observations": n,
+            "mean": round(mean, 4),
+            "std": round(std, 4),
+            "zscore": round((latest - mean) / std, 2) if std > 1e-12 else 0.0,
+            "percentile": round(100 * rank / n, 1),
+            "ewma": round(self.ewma, 4),
+            "ewm_std": round(sqrt(self.ewvar), 4),
+        }
+
+
+class RegimeTracker:
+    """Current risk band for a score, with hysteresis so a score hovering on an edge doesn't flap.
+
+    `bands` is a list of (upper bound or None, label) in ascending order,
+    using the same `score <= bound` rule as classify_risk_level.
+    """
+
+    def __init__(self, bands, hysteresis=REGIME_HYSTERESIS):
+        self.bounds = [bound for bound, _ in bands if bound is not None]
+        self.labels = [label for _, label in bands]
+        self.hysteresis = hysteresis
+        self.band = None
+
+    def observe(self, score):
+        """Returns (old_band, new_band) indices on a regime transition, else None."""
+        band = bisect_left(self.bounds, score)
+        if self.band is None:
+            self.band = band
+            return None
+        if band == self.band:
+            return None
+        if band > self.band:
+            margin = score - self.bounds[band - 1]
+        else:
+            margin = self.bounds[band] - score
+        if margin < self.hysteresis:
+            return None
+        old, self.band = self.band, band
+        return old, band
+
+    @property
+    def label(self):
+        return self.labels[self.band] if self.band is not None else None
+
+
+class Analytics:
+    def __init__(self, bands, window=WINDOW, halflife=EWMA_HALFLIFE, max_alerts=MAX_ALERTS):
+        self.window = window
+        self.halflife = halflife
+        self.stats = {}  # (group, name) -> RollingStat
+        self.regime = RegimeTracker(bands)
+        self.alerts = deque(maxlen=max_alerts)
+
+    def stat(self, group, name):
+        key = (group, name)
+        if key not in self.stats:
+            self.stats[key] = RollingStat(self.window, self.halflife)
+        return self.stats[key]
+
+    def observe(self, group, name, date, value):
+        if value is not None:
+            self.stat(group, name).observe(date, value)
+
+    def observe_composite(self, date, score):
+        """Track the composite score; returns an alert dict if it crossed into a new risk band."""
+        self.observe("composite", "composite", date, score)
+        transition = self.regime.observe(score)
+        if transition is None:
+            return None
+        old, new = transition
+        alert = {
+            "type": "regime_change",
+            "from": self.regime.labels[old],
+            "to": self.regime.labels[new],
+            "direction": "risk_off" if new > old else "risk_on",
+            "score": score,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        self.alerts.append(alert)
+        return alert
+
+    def summary(self):
+        result = {"regime": self.regime.label}
+        for (group, name), stat in self.stats.items():
+            result.setdefault(group, {})[name] = stat.summary()
+        return result
@@ -1,16 +1,39 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, Response, g
 import os
+import hmac
 from dotenv import load_dotenv
 from fredapi import Fred
 import yfinance as yf
 from urllib.parse import unquote
-from threading import Thread
-from time import sleep
-from datetime import datetime
+from threading import Thread, Lock
+from time import sleep, perf_counter
+from datetime import datetime, timedelta
+from bisect import bisect_left
+from collections import defaultdict
 import json
-from twitter_feed import twitter_feed
+import numpy as np
+import pandas as pd
+from twitter_feed import twitter_feed, tweet_feed, BEARER_TOKEN as TWITTER_BEARER_TOKEN, TWITTER_POLL_SECONDS
+from fred_fetcher import FredFetcher
+from series_store import SeriesStore
+from snapshot_store import SnapshotStore, RefresherLock
+from event_stream import Broadcaster, format_sse
+from response_cache import ResponseCache
+from score_graph import ScoreGraph
+from refresh_scheduler import RefreshScheduler, next_fred_due, series_frequency, INTRADAY_INTERVAL, RETRY_INTERVAL
+from indicators import IndicatorContext, compile_indicators, staleness, yoy_key
+from history_store import HistoryStore, RANGES, TIER_POINTS
+from analytics import Analytics
+import backtest
+import market_summary
+import metrics
+from metrics import CACHE_LOOKUPS, REFRESH_DURATION, REQUEST_LATENCY, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+import log_config
+import logging
 from dotenv import load_dotenv
 load_dotenv()
+log_config.configure_logging()
+logger = logging.getLogger(__name__)
 
 
 
@@ -22,51 +45,37 @@ app = Flask(__name__)
 load_dotenv()
 app.register_blueprint(twitter_feed)
 FRED_API_KEY = os.getenv("FRED_API_KEY")
-TWITTER_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
 fred = Fred(api_key=FRED_API_KEY)
+fred_fetcher = FredFetcher(fred)
+fred_store = SeriesStore()
+yahoo_store = SeriesStore()
+history_store = HistoryStore()
+snapshot_store = SnapshotStore()
+refresher_lock = RefresherLock()
+broadcaster = Broadcaster()
+response_cache = ResponseCache()
 
 # Load dashboard config
 with open("config.json", "r") as f:
     config = json.load(f)
+# Composite score bands, ascending; the last has "max": null
+RISK_LEVELS = config["risk_levels"]
+analytics = Analytics([(level["max"], level["label"]) for level in RISK_LEVELS])
 
 fred_cache = {}
 history_cache = {}
+yahoo_cache = {}
 fred_cache_ttl_minutes = 5
-history_cache_ttl_hours = 6
+yahoo_cache_ttl_minutes = 10  # twice INTRADAY_INTERVAL, so quotes don't go stale just before each job
+snapshot_poll_seconds = 15
+updater_role = None  # "refresher" or "follower" once start_background_updaters has run
 composite_score_cache = {"value": None, "timestamp": None}
+tweet_feed.follow("zerohedge")  # /api/twitter_feed
+tweet_cache = tweet_feed.cache
 
 
-INDICATOR_SOURCES = {
-    "2-Year Yield": ("fred", "DGS2"),
-    "10-Year Yield": ("fred", "DGS10"),
-    "30Y Yield": ("fred", "DGS30"),
-    "UST 2s/10s Curve": ("fred_spread", ("DGS2", "DGS10")),
-    "UST 3m/10y Curve": ("fred_spread", ("TB3MS", "DGS10")),
-    "Fed Funds Rate": ("fred", "FEDFUNDS"),
-    "Unemployment Rate": ("fred", "UNRATE"),
-    "CPI (YoY)": ("fred_yoy", "CPIAUCSL"),
-    "Retail Sales": ("fred", "RSAFS"),
-    "VIX": ("yahoo", "^VIX"),
-    "MOVE Index": ("yahoo", "^MOVE"),
-    "VVIX": ("yahoo", "^VVIX"),
-    "VXTLT": ("yahoo", "^VXTLT"),
-    "HY Spreads": ("fred", "BAMLH0A0HYM2EY"),
-    "Skew Index": ("yahoo", "^SKEW"),
-    "SOFR Spread": ("fred_spread", ("SOFR", "EFFR")),
-    "Gold": ("yahoo", "GC=F"),
-    "Bitcoin": ("yahoo", "BTC-USD"),
-    "USD Index": ("yahoo", "DX-Y.NYB"),
-    "Treasury Demand (Bid/Cover)": ("mock", "bidcover"),
-    "Stress Composite Score": ("mock_composite", ["DGS2", "DGS10", "DGS30", "FEDFUNDS", "UNRATE"])
-}
-
 def calculate_composite_score(data):
-    weights = {
-        "rates_and_curve": 0.15,  # Reduced weight
-        "credit_and_volatility": 0.40,  # Increased weight
-        "macro_indicators": 0.25,
-        "flight_to_safety": 0.20,
-    }
+    weights = backtest.WEIGHTS
     rates_and_curve = normalize_rates_and_curve(data)
     credit_and_volatility = normalize_credit_and_volatility(data)
     macro_indicators = normalize_macro_indicators(data)
@@ -80,252 +89,484 @@ def calculate_composite_score(data):
     )
 
     # Log the components for debugging
-    print(f"[Composite Score Calculation] Rates & Curve: {rates_and_curve}, "
-          f"Credit & Volatility: {credit_and_volatility}, "
-          f"Macro Indicators: {macro_indicators}, "
-          f"Flight to Safety: {flight_to_safety}, "
-          f"Composite Score: {composite_score}")
+    logger.debug("[Composite Score Calculation] Rates & Curve: %s, Credit & Volatility: %s, "
+                 "Macro Indicators: %s, Flight to Safety: %s, Composite Score: %s",
+                 rates_and_curve, credit_and_volatility, macro_indicators, flight_to_safety, composite_score)
 
     return round(composite_score, 2)
 
-def normalize_rates_and_curve(data):
-    two_year = data.get("two_year_yield", 0)
-    ten_year = data.get("ten_year_yield", 0)
-    thirty_year = data.get("thirty_year_yield", 0)
-    ust_2s10s = data.get("ust_2s10s_curve", 0)
-    ust_3m10y = data.get("ust_3m10y_curve", 0)
+def score_inputs(data):
+    """Score inputs for the shared backtest formulas; missing inputs count as 0."""
+    return defaultdict(int, data)
 
-    # Penalize near-zero or barely positive spreads
-    curve_inversion_score = max(0, min(100, (0.5 - ust_2s10s) * 300))  # Increased sensitivity
-    rates_score = max(0, min(100, (two_year + ten_year + thirty_year - 9) * 15))  # Penalize high yields more
 
-    normalized_score = (curve_inversion_score + rates_score) / 2
+def normalize_rates_and_curve(data):
+    normalized_score = float(backtest.rates_and_curve(score_inputs(data)))
 
-    print(f"[Rates & Curve] Inputs: 2Y={two_year}, 10Y={ten_year}, 30Y={thirty_year}, "
-          f"2s10s={ust_2s10s}, 3m10y={ust_3m10y} | Normalized Score: {normalized_score}")
+    logger.debug("[Rates & Curve] Inputs: 2Y=%s, 10Y=%s, 30Y=%s, 2s10s=%s, 3m10y=%s | Normalized Score: %s",
+                 data.get("two_year_yield"), data.get("ten_year_yield"), data.get("thirty_year_yield"),
+                 data.get("ust_2s10s_curve"), data.get("ust_3m10y_curve"), normalized_score)
 
     return normalized_score
 
 def normalize_credit_and_volatility(data):
-    vix = data.get("vix", 0)
-    move_index = data.get("move_index", 0)
-    vx_tlt = data.get("vx_tlt", 0)
-    hy_credit_spread = data.get("hy_credit_spread", 0)
-
-    # Adjust thresholds for VIX and HY spreads
-    vix_score = max(0, min(100, (vix - 15) * 6))  # Increased sensitivity for VIX > 35
-    move_score = max(0, min(100, (move_index - 100) * 2))  # MOVE > 150 = 100
-    credit_spread_score = max(0, min(100, hy_credit_spread * 15))  # Increased sensitivity for HY spreads
+    normalized_score = float(backtest.credit_and_volatility(score_inputs(data)))
 
-    normalized_score = (vix_score + move_score + credit_spread_score + vx_tlt) / 4
-
-    print(f"[Credit & Volatility] Inputs: VIX={vix}, MOVE={move_index}, VXTLT={vx_tlt}, "
-          f"HY Spread={hy_credit_spread} | Normalized Score: {normalized_score}")
+    logger.debug("[Credit & Volatility] Inputs: VIX=%s, MOVE=%s, VXTLT=%s, HY Spread=%s | Normalized Score: %s",
+                 data.get("vix"), data.get("move_index"), data.get("vx_tlt"), data.get("hy_credit_spread"),
+                 normalized_score)
 
     return normalized_score
 
 def normalize_macro_indicators(data):
-    fed_funds_rate = data.get("fed_funds_rate", 0)
-    cpi_yoy = data.get("cpi_yoy", 0)
-    unemployment_rate = data.get("unemployment_rate", 0)
-    retail_sales = data.get("retail_sales", 0)
-
-    # Penalize elevated unemployment and flat retail sales
-    unemployment_score = max(0, min(100, (unemployment_rate - 3) * 30))  # Increased sensitivity
-    inflation_score = max(0, min(100, (cpi_yoy - 2) * 50))  # CPI > 2 = stress
-    retail_sales_score = max(0, min(100, 100 - (retail_sales / 8000)))  # Penalize lower sales more
-
-    normalized_score = (inflation_score + unemployment_score + retail_sales_score + fed_funds_rate) / 4
+    normalized_score = float(backtest.macro_indicators(score_inputs(data)))
 
-    print(f"[Macro Indicators] Inputs: Fed Funds={fed_funds_rate}, CPI YoY={cpi_yoy}, "
-          f"Unemployment={unemployment_rate}, Retail Sales={retail_sales} | "
-          f"Normalized Score: {normalized_score}")
+    logger.debug("[Macro Indicators] Inputs: Fed Funds=%s, CPI YoY=%s, Unemployment=%s, Retail Sales=%s | "
+                 "Normalized Score: %s",
+                 data.get("fed_funds_rate"), data.get("cpi_yoy"), data.get("unemployment_rate"),
+                 data.get("retail_sales"), normalized_score)
 
     return normalized_score
 
 
 def normalize_flight_to_safety(data):
-    gold_price = data.get("gold_price", 0)
-    bitcoin_price = data.get("bitcoin_price", 0)
-    sofr_spread = data.get("sofr_spread", 0)
+    normalized_score = float(backtest.flight_to_safety(score_inputs(data)))
 
-    # Penalize rising gold and falling Bitcoin more heavily
-    gold_score = max(0, min(100, (gold_price - 1800) / 1.5))  # Increased sensitivity for gold > 2000
-    bitcoin_score = max(0, min(100, (60000 - bitcoin_price) / 400))  # Penalize falling BTC more
+    logger.debug("[Flight to Safety] Inputs: Gold=%s, Bitcoin=%s, SOFR Spread=%s | Normalized Score: %s",
+                 data.get("gold_price"), data.get("bitcoin_price"), data.get("sofr_spread"), normalized_score)
 
-    normalized_score = (gold_score + bitcoin_score) / 2
+    return normalized_score
 
-    print(f"[Flight to Safety] Inputs: Gold={gold_price}, Bitcoin={bitcoin_price}, "
-          f"SOFR Spread={sofr_spread} | Normalized Score: {normalized_score}")
+def fred_indicator_sources():
+    return {name: ind.derive_spec for name, ind in INDICATORS.items() if ind.derive_spec}
+
+
+def fetch_fred_series(series_ids, now=None):
+    """Refresh the shared FRED series store once and feed both fred_cache and history_cache.
+
+    Each entry's "stale_after" comes from the series' next refresh time, and
+    is set before the snapshot is saved so followers see it too.
+    Ids whose fetch failed keep their old timestamp and "stale_after".
+    Returns (updated, fetched): the ("fred", key) entries whose cached value
+    changed, and the series ids that were fetched successfully.
+    """
+    now = now or datetime.utcnow()
+    fetched, changed = fred_store.refresh_fred(fred_fetcher, series_ids)
+    indicators = fred_indicator_sources()
+    derived = fred_store.derive(indicators)
+
+    # Transformed values get their own fred_cache key, so a plain indicator on
+    # the same series still reads the raw value. YoY indicators on one series share one value.
+    yoy_names = {}
+    for name, (kind, arg) in indicators.items():
+        if kind == "fred_yoy":
+            yoy_names.setdefault(arg, name)
+    updated = set()
+    for sid in fetched:
+        series = fred_store.get(sid)
+        if series is None or series.empty:
+            continue
+        # Only overdue refreshes make a value stale, not long release gaps
+        stale_after = next_fred_due(series, now) + RETRY_INTERVAL
+        values = {sid: series}
+        if sid in yoy_names and yoy_names[sid] in derived:
+            values[yoy_key(sid)] = derived[yoy_names[sid]]
+        for key, values_series in values.items():
+            try:
+                value = round(float(values_series.iloc[-1]), 4)
+                if fred_cache.get(key, {}).get("value") != value:
+                    updated.add(("fred", key))
+                fred_cache[key] = {"value": value, "timestamp": now, "stale_after": stale_after}
+                logger.debug("[FRED] Cached %s: %s", key, value)
+            except Exception as e:
+                logger.warning("[FRED] Error: %s - %s", key, e)
+
+    for name, series in derived.items():
+        history_store.update(name, series)
+        history_cache[name] = [
+            {"date": str(date.date()), "value": round(float(val), 4)}
+            for date, val in series.tail(7).items()
+        ]
+        logger.debug("History cached for %s: %s", name, history_cache[name])
+
+    snapshot_store.save_series({sid: fred_store.get(sid) for sid in changed})
+    save_snapshot("fred_cache", "history_cache")
+    data_changed()
+    return updated, fetched
+
+
+def yahoo_symbols():
+    return sorted({ind.yahoo_symbol for ind in INDICATORS.values() if ind.yahoo_symbol})
+
+
+def download_yahoo_closes(symbols, period):
+    """Fetch daily closes for many Yahoo symbols in one multi-ticker download.
+
+    Returns {symbol: Series of closes}. Symbols missing from the batched
+    result are retried individually so one bad ticker doesn't sink the rest.
+    """
+    symbols = list(symbols)
+    closes = {}
+    if not symbols:
+        return closes
+    start = perf_counter()
+    try:
+        data = yf.download(symbols, period=period, interval="1d", group_by="ticker",
+                           auto_adjust=False, progress=False, threads=True)
+        UPSTREAM_LATENCY.observe(perf_counter() - start, "yahoo_batch")
+        for symbol in symbols:
+            try:
+                series = data[symbol]["Close"].dropna()
+            except KeyError:
+                continue
+            if not series.empty:
+                closes[symbol] = series
+    except Exception as e:
+        UPSTREAM_ERRORS.inc("yahoo_batch")
+        logger.warning("[Yahoo] Batch download error: %s", e)
+
+    for symbol in symbols:
+        if symbol in closes:
+            continue
+        start = perf_counter()
+        try:
+            hist = yf.Ticker(symbol).history(period=period, interval="1d")
+            UPSTREAM_LATENCY.observe(perf_counter() - start, "yahoo")
+            if hist.empty:
+                logger.warning("[Yahoo] No data for %s", symbol)
+                continue
+            closes[symbol] = hist["Close"].dropna()
+            logger.info("[Yahoo] Fallback fetch used for %s", symbol)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc("yahoo")
+            logger.warning("[Yahoo] Error: %s - %s", symbol, e)
+    return closes
 
-    return normalized_score
 
-def fetch_fred_series(series_ids):
+def fetch_yahoo_quotes(symbols):
     now = datetime.utcnow()
-    for sid in series_ids:
+    for symbol, series in download_yahoo_closes(symbols, period="2d").items():
+        if series.empty:
+            continue
+        value = round(float(series.iloc[-1]), 2)
+        yahoo_cache[symbol] = {"value": value, "timestamp": now}
+        logger.debug("[Yahoo] Cached %s: %s", symbol, value)
+    save_snapshot("yahoo_cache")
+    data_changed()
+
+
+_yahoo_refresh_lock = Lock()
+
+
+def refresh_yahoo_quotes_async():
+    """Refresh the Yahoo quote cache in a background thread (at most one in flight)."""
+    if not _yahoo_refresh_lock.acquire(blocking=False):
+        return
+
+    def run():
         try:
-            series = fred.get_series(sid)
-            if sid == "CPIAUCSL" and len(series) >= 13:
-                value = ((series.iloc[-1] - series.iloc[-13]) / series.iloc[-13]) * 100
-            else:
-                value = float(series.iloc[-1])
-            fred_cache[sid] = {"value": round(value, 4), "timestamp": now}
-            print(f"[FRED] Cached {sid}: {value}")
-        except Exception as e:
-            print(f"[FRED] Error: {sid} - {e}")
+            fetch_yahoo_quotes(yahoo_symbols())
+        finally:
+            _yahoo_refresh_lock.release()
+
+    Thread(target=run, daemon=True).start()
+
+
+def get_yahoo_quote(symbol, revalidate=True):
+    """Return the cached quote for a symbol without touching the network.
+
+    Stale-while-revalidate: a missing or expired entry schedules a background
+    refresh and the last known value (or None) is returned straight away.
+    Only a process without background updaters revalidates; the refresher's
+    scheduled Yahoo job already keeps the cache fresh.
+    """
+    entry = yahoo_cache.get(symbol)
+    CACHE_LOOKUPS.inc("yahoo_cache", "hit" if entry else "miss")
+    age = (datetime.utcnow() - entry["timestamp"]).total_seconds() if entry else None
+    stale = age is None or age > yahoo_cache_ttl_minutes * 60
+    if stale and revalidate and updater_role is None:
+        refresh_yahoo_quotes_async()
+    if entry is None:
+        return None
+    return {"value": entry["value"], "timestamp": entry["timestamp"], "stale": stale}
 
 
 def prefetch_history():
-    for name, source in INDICATOR_SOURCES.items():
+    """Keep full daily Yahoo histories in yahoo_store and feed the sparkline tails.
+
+    Symbols seen for the first time get their whole history; after that only
+    the last month is downloaded and merged. Returns the ("history", name)
+    entries whose sparkline changed.
+    """
+    yahoo_names = {}
+    for name, ind in INDICATORS.items():
+        if ind.yahoo_symbol:
+            yahoo_names.setdefault(ind.yahoo_symbol, []).append(name)
+
+    new_symbols = [symbol for symbol in yahoo_names if yahoo_store.get(symbol) is None]
+    known_symbols = [symbol for symbol in yahoo_names if symbol not in new_symbols]
+    closes = download_yahoo_closes(new_symbols, period="max")
+    closes.update(download_yahoo_closes(known_symbols, period="1mo"))
+
+    changed = set()
+    for symbol, series in closes.items():
+        series = series.astype(float)
+        series.index = pd.DatetimeIndex(series.index).tz_localize(None).normalize()
+        if yahoo_store.merge(symbol, series):
+            changed.add(symbol)
+
+    updated = set()
+    for symbol, names in yahoo_names.items():
+        series = yahoo_store.get(symbol)
+        if series is None:
+            continue
+        for name in names:
+            history_store.update(name, series)
+            values = [
+                {"date": str(idx.date()), "value": round(float(val), 2)}
+                for idx, val in series.tail(7).items()
+            ]
+            if history_cache.get(name) != values:
+                updated.add(("history", name))
+            history_cache[name] = values
+            logger.debug("History cached for %s: %s", name, history_cache[name])
+    snapshot_store.save_series({f"yahoo:{symbol}": yahoo_store.get(symbol) for symbol in changed})
+    save_snapshot("history_cache")
+    data_changed()
+    return updated
+
+
+def save_snapshot(*names):
+    try:
+        for name in names:
+            snapshot_store.save_cache(name, globals()[name])
+    except Exception as e:
+        logger.exception("[Snapshot] Save error: %s", e)
+
+
+def load_snapshot(caches=True, series=True):
+    """Warm the in-memory caches and series store from the on-disk snapshot."""
+    try:
+        if caches:
+            stored = snapshot_store.load_caches()
+            for name in ["fred_cache", "yahoo_cache", "history_cache", "composite_score_cache", "tweet_cache"]:
+                if name in stored:
+                    data, updated_at = stored[name]
+                    globals()[name].update(data)
+                    logger.info("[Snapshot] Loaded %s (saved %s)", name, updated_at.isoformat())
+        if series:
+            for key, values in snapshot_store.load_series().items():
+                if key.startswith("yahoo:"):
+                    yahoo_store.merge(key[len("yahoo:"):], values)
+                else:
+                    fred_store.merge(key, values)
+            for name, series in fred_store.derive(fred_indicator_sources()).items():
+                history_store.update(name, series)
+            for name, ind in INDICATORS.items():
+                if ind.yahoo_symbol and yahoo_store.get(ind.yahoo_symbol) is not None:
+                    history_store.update(name, yahoo_store.get(ind.yahoo_symbol))
+    except Exception as e:
+        logger.exception("[Snapshot] Load error: %s", e)
+    data_changed()
+
+
+def start_background_updaters():
+    """Load the snapshot, then either become the refresher or follow its snapshot.
+
+    Under a multi-worker server every process calls this; the one that wins
+    the refresher lock talks to upstream APIs and writes the snapshot, the
+    rest reload from it whenever it changes and retry the election so a
+    new refresher takes over if the current one dies.
+    """
+    global updater_role
+    if updater_role is not None:
+        return
+    load_snapshot()
+    if refresher_lock.try_acquire():
+        updater_role = "refresher"
+        start_refreshers()
+    else:
+        updater_role = "follower"
+        Thread(target=loop_follow_snapshot, daemon=True).start()
+    logger.info("[Updaters] Running as %s (pid %s)", updater_role, os.getpid())
+
+
+def loop_follow_snapshot():
+    global updater_role
+    versions = snapshot_store.versions()
+    while True:
+        sleep(snapshot_poll_seconds)
+        if refresher_lock.try_acquire():
+            updater_role = "refresher"
+            logger.info("[Updaters] Promoted to refresher (pid %s)", os.getpid())
+            start_refreshers()
+            return
         try:
-            if source[0] == "yahoo":
-                ticker = yf.Ticker(source[1])
-                hist = ticker.history(period="7d", interval="1d")
-                if not hist.empty:
-                    history_cache[name] = [
-                        {"date": str(idx.date()), "value": round(val, 2)}
-                        for idx, val in hist["Close"].dropna().items()
-                    ]
-                    print(f"[DEBUG] History cached for {name}: {history_cache[name]}")  # Debug log
-            elif source[0] in ["fred", "fred_yoy", "fred_spread"]:
-                sid = source[1] if source[0] != "fred_spread" else source[1][1]
-                series = fred.get_series(sid).dropna().tail(7)
-                history_cache[name] = [
-                    {"date": str(date.date()), "value": round(val, 4)}
-                    for date, val in series.items()
-                ]
-                print(f"[DEBUG] History cached for {name}: {history_cache[name]}")  # Debug log
+            latest = snapshot_store.versions()
         except Exception as e:
-            print(f"[History] Error for {name}: {e}")
+            logger.warning("[Snapshot] Poll error: %s", e)
+            continue
+        if latest != versions:
+            load_snapshot(caches=latest[0] != versions[0], series=latest[1] != versions[1])
+            versions = latest
 
 
-def start_background_updaters():
+def fred_series_ids():
     series_ids = set()
-    for src in INDICATOR_SOURCES.values():
-        if src[0] == "fred":
-            series_ids.add(src[1])
-        elif src[0] == "fred_spread":
-            series_ids.update(src[1])
-        elif src[0] == "fred_yoy":
-            series_ids.add(src[1])
-        elif src[0] == "mock_composite":
-            series_ids.update(src[1])
-
-    def loop_fred():
-        while True:
-            fetch_fred_series(series_ids)
-            sleep(fred_cache_ttl_minutes * 60)
+    for ind in INDICATORS.values():
+        series_ids.update(ind.fred_series)
+    return series_ids
 
-    def loop_history():
-        while True:
-            prefetch_history()
-            sleep(history_cache_ttl_hours * 3600)
 
-    def loop_composite_score():
+refresh_scheduler = RefreshScheduler()
+
+
+def run_due_jobs(keys):
+    """Run one batch of due refresh jobs, reschedule them, then recompute dirty sub-scores."""
+    now = datetime.utcnow()
+    updated = set()
+    sids = [key[1] for key in keys if key[0] == "fred"]
+    if sids:
+        start = perf_counter()
+        fetched = set()
+        try:
+            fred_updated, fetched = fetch_fred_series(sids, now)
+            updated |= fred_updated
+        except Exception as e:
+            logger.exception("[Refresh] FRED error: %s", e)
+        REFRESH_DURATION.observe(perf_counter() - start, "fred")
+        for sid in sids:
+            # Failed fetches are retried soon rather than waiting for the next release
+            due = next_fred_due(fred_store.get(sid), now) if sid in fetched else now + RETRY_INTERVAL
+            refresh_scheduler.schedule(("fred", sid), due)
+    if ("yahoo",) in keys:
+        start = perf_counter()
+        try:
+            fetch_yahoo_quotes(yahoo_symbols())
+            updated |= prefetch_history()
+        except Exception as e:
+            logger.exception("[Refresh] Yahoo error: %s", e)
+        REFRESH_DURATION.observe(perf_counter() - start, "yahoo")
+        refresh_scheduler.schedule(("yahoo",), now + INTRADAY_INTERVAL)
+    if ("tweets",) in keys:
+        start = perf_counter()
+        try:
+            tweet_feed.refresh()
+            save_snapshot("tweet_cache")
+        except Exception as e:
+            logger.exception("[Refresh] Twitter error: %s", e)
+        REFRESH_DURATION.observe(perf_counter() - start, "tweets")
+        refresh_scheduler.schedule(("tweets",), now + timedelta(seconds=TWITTER_POLL_SECONDS))
+    score_graph.mark(updated)
+    start = perf_counter()
+    update_composite_score()
+    REFRESH_DURATION.observe(perf_counter() - start, "composite")
+    write_market_summary()
+
+
+last_summary_version = None
+
+
+def write_market_summary():
+    """Publish the compact summary the chatbot uses as context, if its content changed."""
+    global last_summary_version
+    try:
+        state = dashboard_state(revalidate=False)
+        changes = {name: history_store.change(name, market_summary.CHANGE_DAYS) for name in state["indicators"]}
+        summary = market_summary.build_summary(state, changes)
+        if summary["version"] != last_summary_version:
+            market_summary.write_summary(summary)
+            last_summary_version = summary["version"]
+    except Exception as e:
+        logger.warning("[Summary] Write error: %s", e)
+
+
+def start_refreshers():
+    now = datetime.utcnow()
+    refresh_scheduler.schedule(("yahoo",), now)
+    if TWITTER_BEARER_TOKEN:
+        refresh_scheduler.schedule(("tweets",), now)
+    else:
+        logger.warning("[Twitter] TWITTER_BEARER_TOKEN is missing; tweet feeds disabled")
+    for sid in fred_series_ids():
+        refresh_scheduler.schedule(("fred", sid), now)
+
+    def loop_refresh():
         while True:
-            update_composite_score()
-            sleep(fred_cache_ttl_minutes * 60)  # Update composite score periodically
+            due = refresh_scheduler.pop_due(datetime.utcnow())
+            if due:
+                try:
+                    run_due_jobs(due)
+                except Exception as e:
+                    logger.exception("[Refresh] Error: %s", e)
+            next_due = refresh_scheduler.next_due()
+            wait = (next_due - datetime.utcnow()).total_seconds() if next_due else 60
+            sleep(min(60, max(1, wait)))
+
+    # Serve the last snapshot immediately; the first jobs run in the background
+    Thread(target=loop_refresh, daemon=True).start()
+
+
+def gather_score_inputs():
+    # Gather data from the cache
+    return {
+        "two_year_yield": fred_cache.get("DGS2", {}).get("value"),
+        "ten_year_yield": fred_cache.get("DGS10", {}).get("value"),
+        "thirty_year_yield": fred_cache.get("DGS30", {}).get("value"),
+        "ust_2s10s_curve": fred_cache.get("DGS10", {}).get("value") - fred_cache.get("DGS2", {}).get("value"),
+        "ust_3m10y_curve": fred_cache.get("DGS10", {}).get("value") - fred_cache.get("TB3MS", {}).get("value"),
+        "fed_funds_rate": fred_cache.get("FEDFUNDS", {}).get("value"),
+        "unemployment_rate": fred_cache.get("UNRATE", {}).get("value"),
+        "cpi_yoy": fred_cache.get(yoy_key("CPIAUCSL"), {}).get("value"),
+        "retail_sales": fred_cache.get("RSAFS", {}).get("value"),
+        "vix": history_cache.get("VIX", [{}])[-1].get("value"),
+        "move_index": history_cache.get("MOVE Index", [{}])[-1].get("value"),
+        "vx_tlt": history_cache.get("VXTLT", [{}])[-1].get("value"),
+        "sofr_spread": fred_cache.get("SOFR", {}).get("value") - fred_cache.get("EFFR", {}).get("value"),
+        "hy_credit_spread": fred_cache.get("BAMLH0A0HYM2EY", {}).get("value"),
+        "gold_price": history_cache.get("Gold", [{}])[-1].get("value"),
+        "bitcoin_price": history_cache.get("Bitcoin", [{}])[-1].get("value"),
+    }
+
 
-    # Preload data and calculate the composite score at startup
-    fetch_fred_series(series_ids)
-    prefetch_history()
-    update_composite_score()  # Ensure the composite score is calculated at startup
+score_graph = ScoreGraph(
+    normalizers={
+        "rates_and_curve": normalize_rates_and_curve,
+        "credit_and_volatility": normalize_credit_and_volatility,
+        "macro_indicators": normalize_macro_indicators,
+        "flight_to_safety": normalize_flight_to_safety,
+    },
+    weights=backtest.WEIGHTS,
+)
 
-    # Start background threads
-    Thread(target=loop_fred, daemon=True).start()
-    Thread(target=loop_history, daemon=True).start()
-    Thread(target=loop_composite_score, daemon=True).start()
 
 def update_composite_score():
+    """Recompute dirty sub-scores and swap the result into composite_score_cache in one update."""
     try:
-        # Gather data from the cache
-        data = {
-            "two_year_yield": fred_cache.get("DGS2", {}).get("value"),
-            "ten_year_yield": fred_cache.get("DGS10", {}).get("value"),
-            "thirty_year_yield": fred_cache.get("DGS30", {}).get("value"),
-            "ust_2s10s_curve": fred_cache.get("DGS10", {}).get("value") - fred_cache.get("DGS2", {}).get("value"),
-            "ust_3m10y_curve": fred_cache.get("DGS10", {}).get("value") - fred_cache.get("TB3MS", {}).get("value"),
-            "fed_funds_rate": fred_cache.get("FEDFUNDS", {}).get("value"),
-            "unemployment_rate": fred_cache.get("UNRATE", {}).get("value"),
-            "cpi_yoy": fred_cache.get("CPIAUCSL", {}).get("value"),
-            "retail_sales": fred_cache.get("RSAFS", {}).get("value"),
-            "vix": history_cache.get("VIX", [{}])[-1].get("value"),
-            "move_index": history_cache.get("MOVE Index", [{}])[-1].get("value"),
-            "vx_tlt": history_cache.get("VXTLT", [{}])[-1].get("value"),
-            "sofr_spread": fred_cache.get("SOFR", {}).get("value") - fred_cache.get("EFFR", {}).get("value"),
-            "hy_credit_spread": fred_cache.get("BAMLH0A0HYM2EY", {}).get("value"),
-            "gold_price": history_cache.get("Gold", [{}])[-1].get("value"),
-            "bitcoin_price": history_cache.get("Bitcoin", [{}])[-1].get("value"),
-        }
-
-        # Calculate the composite score
-        rates_and_curve = normalize_rates_and_curve(data)
-        credit_and_volatility = normalize_credit_and_volatility(data)
-        macro_indicators = normalize_macro_indicators(data)
-        flight_to_safety = normalize_flight_to_safety(data)
-
-        score = calculate_composite_score(data)
-        composite_score_cache.update({
-            "value": score,
-            "timestamp": datetime.utcnow(),
-            "rates_and_curve": rates_and_curve,
-            "credit_and_volatility": credit_and_volatility,
-            "macro_indicators": macro_indicators,
-            "flight_to_safety": flight_to_safety,
-        })
-        print(f"[DEBUG] Composite Score Updated: {composite_score_cache}")
+        result = score_graph.recompute(gather_score_inputs)
+        if result is None:
+            return
+        composite_score_cache.update({**result, "timestamp": datetime.utcnow()})
+        logger.debug("Composite Score Updated: %s", composite_score_cache)
+        save_snapshot("composite_score_cache")
+        data_changed()
     except Exception as e:
-        print(f"[Composite Score] Error: {e}")
+        logger.warning("[Composite Score] Error: %s", e)
 
 def classify_risk_level(score):
-    """Classify the composite score into a risk level."""
-    if score <= 20:
-        return {
-            "range": "0-20",
-            "label": "Ultra Risk-On",
-            "description": "Markets are in extreme risk appetite mode. Volatility is suppressed, yield curves are normal, credit spreads are tight, and macro indicators are strong. Conditions are historically bullish."
-        }
-    elif score <= 40:
-        return {
-            "range": "21-40",
-            "label": "Risk-On",
-            "description": "Risk appetite is evident. Most indicators suggest stability or optimism. Moderate caution is warranted but conditions favor constructive positioning."
-        }
-    elif score <= 60:
-        return {
-            "range": "41-60",
-            "label": "Neutral / Caution",
-            "description": "Mixed signals. Macro is uncertain, volatility is elevated, and curve signals may be flattening or inverting. This is a no-man’s-land environment; watch for regime shifts."
-        }
-    elif score <= 80:
-        return {
-            "range": "61-80",
-            "label": "Risk-Off",
-            "description": "Volatility and credit spreads are rising, macro indicators are weakening, and safety trades (e.g., gold, short duration) are gaining. Red flags are present across several categories."
-        }
-    else:
-        return {
-            "range": "81-100",
-            "label": "Crisis / Extreme Risk-Off",
-            "description": "Broad-based market stress is underway. Curve inversion, credit dysfunction, macro deterioration, and flight to safety are all flashing at once. This score historically aligns with systemic events or severe drawdowns."
-        }
+    """Classify the composite score into a risk level (bands from config.json "risk_levels")."""
+    if score is None:
+        return None
+    for level in RISK_LEVELS:
+        if level["max"] is None or score <= level["max"]:
+            return {key: level[key] for key in ("range", "label", "description")}
 
 def fetch_latest_tweets(username="zerohedge", count=5):
-    try:
-        client = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN)
-        user = client.get_user(username=username)
-        tweets = client.get_users_tweets(user.data.id, max_results=count)
-
-        tweet_data = []
-        for tweet in tweets.data:
-            tweet_data.append({
-                "text": tweet.text,
-                "created_at": str(tweet.created_at) if tweet.created_at else "N/A"
-            })
-        return tweet_data
-    except Exception as e:
-        print(f"[Twitter] Error fetching tweets: {e}")
-        return []
+    """Latest tweets for a followed account, from the background-refreshed feed."""
+    return [
+        {"text": tweet["text"], "created_at": tweet["created_at"] or "N/A"}
+        for tweet in tweet_feed.tweets(username)[:count]
+    ]
 
 @app.route("/api/twitter_feed")
 def twitter_feed():
@@ -335,51 +576,144 @@ def twitter_feed():
     })
 
 
+def indicator_payload(indicator_name, revalidate=True):
+    """Current value (plus staleness metadata where known) for one indicator."""
+    indicator = INDICATORS.get(indicator_name)
+    if indicator is None:
+        return {"name": indicator_name, "value": None, "error": "No source"}
+    try:
+        return indicator.payload(revalidate)
+    except Exception as e:
+        return {"name": indicator_name, "value": None, "error": str(e)}
+
+
 @app.route("/api/indicator/<path:indicator_name>")
 def get_indicator_data(indicator_name):
     indicator_name = unquote(indicator_name)
-    source_info = INDICATOR_SOURCES.get(indicator_name)
+    indicator = INDICATORS.get(indicator_name)
+    if indicator is not None and indicator.kind == "composite":
+        # Redirect to the composite score API
+        return get_composite_score()
+    if indicator is None:
+        return jsonify(indicator_payload(indicator_name))  # not cached: any URL would add an entry
+    return response_cache.respond(("indicator", indicator_name), lambda: indicator_payload(indicator_name))
 
-    if not source_info:
-        return jsonify({"name": indicator_name, "value": None, "error": "No source"})
 
+@app.route("/api/history/<path:indicator_name>")
+def get_indicator_history(indicator_name):
+    """Sparkline history; ?range=1w|1y|10y|max&points=N serves a downsampled longer window."""
+    indicator_name = unquote(indicator_name)
+    range_name = request.args.get("range")
+    if range_name is None:
+        CACHE_LOOKUPS.inc("history_cache", "hit" if indicator_name in history_cache else "miss")
+        if indicator_name not in history_cache:
+            return jsonify({"name": indicator_name, "values": []})
+        return response_cache.respond(("history", indicator_name), lambda: {
+            "name": indicator_name,
+            "values": history_cache.get(indicator_name, [])
+        })
+    if range_name not in RANGES:
+        return jsonify({"error": f"range must be one of {', '.join(RANGES)}"}), 400
     try:
-        if indicator_name == "Stress Composite Score":
-            # Redirect to the composite score API
-            return get_composite_score()
-        elif source_info[0] == "fred":
-            return jsonify({"name": indicator_name, "value": fred_cache.get(source_info[1], {}).get("value")})
-        elif source_info[0] == "fred_yoy":
-            return jsonify({"name": indicator_name, "value": fred_cache.get(source_info[1], {}).get("value")})
-        elif source_info[0] == "fred_spread":
-            s1, s2 = source_info[1]
-            v1 = fred_cache.get(s1, {}).get("value")
-            v2 = fred_cache.get(s2, {}).get("value")
-            return jsonify({"name": indicator_name, "value": round(v2 - v1, 4)}) if v1 and v2 else jsonify({"value": None})
-        elif source_info[0] == "yahoo":
-            data = yf.Ticker(source_info[1]).history(period="2d")
-            if not data.empty:
-                return jsonify({"name": indicator_name, "value": round(data['Close'].iloc[-1], 2)})
-        elif source_info[0] == "mock_composite":
-            values = [fred_cache.get(sid, {}).get("value") for sid in source_info[1]]
-            values = [v for v in values if v is not None]
-            avg = sum(values) / len(values) if values else None
-            return jsonify({"name": indicator_name, "value": round(avg, 2) if avg else None})
-        elif source_info[0] == "mock":
-            return jsonify({"name": indicator_name, "value": 1.23})
-    except Exception as e:
-        return jsonify({"name": indicator_name, "value": None, "error": str(e)})
+        points = min(TIER_POINTS, max(3, int(request.args.get("points", 200))))
+    except ValueError:
+        return jsonify({"error": "points must be an integer"}), 400
+    CACHE_LOOKUPS.inc("history_store", "hit" if indicator_name in history_store.histories else "miss")
+    if indicator_name not in history_store.histories:
+        return jsonify(history_payload(indicator_name, range_name, points))
+    return response_cache.respond(("history", indicator_name, range_name, points),
+                                  lambda: history_payload(indicator_name, range_name, points))
+
+
+def history_payload(name, range_name, points):
+    result = history_store.query(name, range_name, points)
+    dates, values = result if result is not None else ([], [])
+    return {
+        "name": name,
+        "range": range_name,
+        "points": len(dates),
+        "values": [{"date": str(d), "value": round(float(v), 4)} for d, v in zip(dates, values)],
+    }
 
-    return jsonify({"name": indicator_name, "value": None})
 
+@app.before_request
+def start_request_timer():
+    g.request_start = perf_counter()
 
-@app.route("/api/history/<path:indicator_name>")
-def get_indicator_history(indicator_name):
-    indicator_name = unquote(indicator_name)
-    return jsonify({
-        "name": indicator_name,
-        "values": history_cache.get(indicator_name, [])
-    })
+
+@app.after_request
+def record_request_latency(response):
+    start = g.get("request_start")
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        REQUEST_LATENCY.observe(perf_counter() - start, route, request.method, str(response.status_code))
+    return response
+
+
+# How long after its last observation a sparkline counts as stale, by series frequency
+HISTORY_STALE_AFTER = {"daily": timedelta(days=4), "monthly": timedelta(days=75)}
+
+
+def _history_entry(points):
+    """A timestamped cache entry for one history_cache list, dated by its last observation."""
+    dates = pd.to_datetime([p["date"] for p in points])
+    last = dates[-1].to_pydatetime()
+    frequency = series_frequency(pd.Series(0, index=dates))
+    return {"timestamp": last, "stale_after": last + HISTORY_STALE_AFTER[frequency]}
+
+
+def cache_gauge(measure):
+    """Gauge callback applying `measure(entries)` to each timestamped cache."""
+    def collect():
+        caches = {"fred_cache": fred_cache, "yahoo_cache": yahoo_cache,
+                  "composite_score_cache": {"composite": composite_score_cache} if composite_score_cache else {},
+                  "history_cache": {name: _history_entry(points) for name, points in history_cache.items() if points}}
+        return {(name,): measure(list(cache.values())) for name, cache in caches.items()}
+    return collect
+
+
+def _oldest_age(entries):
+    stamps = [e["timestamp"] for e in entries if e.get("timestamp")]
+    return (datetime.utcnow() - min(stamps)).total_seconds() if stamps else 0
+
+
+metrics.Gauge("dashboard_cache_entries", "Entries held per cache.", ["cache"],
+              collect=cache_gauge(len))
+metrics.Gauge("dashboard_cache_stale_entries", "Entries past their staleness deadline per cache.", ["cache"],
+              collect=cache_gauge(lambda entries: sum(
+                  staleness(e, fred_cache_ttl_minutes * 60)["stale"] for e in entries)))
+metrics.Gauge("dashboard_cache_oldest_age_seconds", "Age of the oldest entry per cache.", ["cache"],
+              collect=cache_gauge(_oldest_age))
+metrics.Gauge("dashboard_history_series", "Indicators with a sparkline in history_cache.",
+              collect=lambda: {(): len(history_cache)})
+metrics.Gauge("dashboard_data_version", "Data version of the response cache.",
+              collect=lambda: {(): response_cache.version})
+
+
+@app.route("/api/log_level", methods=["GET", "POST"])
+def log_level():
+    """Read or change the log level at runtime, e.g. POST {"level": "DEBUG"}.
+
+    Disabled unless LOG_ADMIN_TOKEN is set; callers send it as X-Admin-Token.
+    """
+    token = os.getenv("LOG_ADMIN_TOKEN")
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+        return jsonify({"error": "Forbidden"}), 403
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        try:
+            level = log_config.set_level(body.get("level", ""), body.get("logger"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        logger.info("Log level for %s set to %s", body.get("logger") or "root", level)
+    return jsonify({"level": log_config.get_level(request.args.get("logger"))})
+
+
+@app.route("/metrics")
+def get_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 
 @app.route("/dashboard")
@@ -398,28 +732,228 @@ def server_status():
         return jsonify({"status": "ok"}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
-    
+
+
+@app.route("/api/fred_timings")
+def fred_timings():
+    return jsonify({
+        sid: dict(t, timestamp=t["timestamp"].isoformat())
+        for sid, t in fred_fetcher.timings.items()
+    })
+
+
+def composite_score_payload():
+    return {
+        "composite_score": composite_score_cache["value"],
+        "details": {
+            "rates_and_curve": composite_score_cache.get("rates_and_curve"),
+            "credit_and_volatility": composite_score_cache.get("credit_and_volatility"),
+            "macro_indicators": composite_score_cache.get("macro_indicators"),
+            "flight_to_safety": composite_score_cache.get("flight_to_safety"),
+        },
+        "risk_classification": classify_risk_level(composite_score_cache["value"]),
+        **staleness(composite_score_cache, fred_cache_ttl_minutes * 60),
+    }
+
+
+# Indicator definitions from config.json, compiled once into resolvers.
+INDICATORS = compile_indicators(config["indicators"], IndicatorContext(
+    fred_cache=fred_cache,
+    fred_ttl_seconds=fred_cache_ttl_minutes * 60,
+    get_yahoo_quote=get_yahoo_quote,
+    composite_payload=composite_score_payload,
+))
+
 
 @app.route("/api/composite_score")
 def get_composite_score():
     try:
-        if composite_score_cache["value"] is None:
-            update_composite_score()
-        print(f"[DEBUG] Composite Score API Response: {composite_score_cache}")  # Add this log
-        return jsonify({
-            "composite_score": composite_score_cache["value"],
-            "details": {
-                "rates_and_curve": composite_score_cache.get("rates_and_curve"),
-                "credit_and_volatility": composite_score_cache.get("credit_and_volatility"),
-                "macro_indicators": composite_score_cache.get("macro_indicators"),
-                "flight_to_safety": composite_score_cache.get("flight_to_safety"),
-            },
-            "risk_classification": classify_risk_level(composite_score_cache["value"])
-        })
+        if composite_score_cache["value"] is None and updater_role != "follower":
+            update_composite_score()  # followers wait for the refresher's snapshot instead
+        return response_cache.respond("composite_score", composite_score_payload)
     except Exception as e:
-        print(f"[Composite Score API] Error: {e}")
+        logger.exception("[Composite Score API] Error: %s", e)
         return jsonify({"error": str(e)}), 500
 
+
+def dashboard_state(revalidate=True):
+    """Current values, sparkline histories and composite score for the whole dashboard."""
+    names = [name for name, ind in INDICATORS.items() if ind.kind != "composite"]
+    return {
+        "indicators": {name: indicator_payload(name, revalidate) for name in names},
+        "history": {name: history_cache[name] for name in names if name in history_cache},
+        "composite": composite_score_payload() if composite_score_cache["value"] is not None else None,
+    }
+
+
+def data_changed():
+    """Called whenever a cache changes: invalidate encoded responses, update analytics, push diffs."""
+    update_analytics()
+    response_cache.bump()
+    publish_changes()
+
+
+_analytics_lock = Lock()
+analytics_seen = {"history": {}, "composite": None}
+
+
+def update_analytics():
+    """Feed observations that arrived since the last call into the rolling statistics.
+
+    Indicators are fed the new points of their daily histories; the composite
+    and its sub-scores are fed the live values, one point per day (later
+    updates the same day revise it). Every process runs this on its own view
+    of the caches, so followers publish the same alerts to their clients.
+    """
+    try:
+        with _analytics_lock:
+            seen = analytics_seen["history"]
+            for name, history in list(history_store.histories.items()):
+                dates, values = history.dates, history.values
+                last = seen.get(name)
+                # Refeed the latest point too, in case today's value was revised
+                first = max(0, len(dates) - analytics.window) if last is None else \
+                    int(np.searchsorted(dates, last, side="left"))
+                for date, value in zip(dates[first:], values[first:]):
+                    analytics.observe("indicator", name, date.item(), value)
+                if len(dates):
+                    seen[name] = dates[-1]
+
+            timestamp = composite_score_cache.get("timestamp")
+            if composite_score_cache.get("value") is None or timestamp == analytics_seen["composite"]:
+                return
+            if analytics_seen["composite"] is None:
+                seed_score_analytics()
+            analytics_seen["composite"] = timestamp
+            today = timestamp.date()
+            for name in backtest.SUB_SCORES:
+                analytics.observe("sub_score", name, today, composite_score_cache.get(name))
+            alert = analytics.observe_composite(today, composite_score_cache["value"])
+        if alert:
+            logger.info("[Analytics] Regime change %s -> %s (score %s)", alert["from"], alert["to"], alert["score"])
+            broadcaster.publish("alert", alert)
+    except Exception as e:
+        logger.exception("[Analytics] Update error: %s", e)
+
+
+def seed_score_analytics():
+    """Prime the sub-score and composite windows with past daily scores (once per process)."""
+    scores = backtest.composite_history({**fred_store.series, **yahoo_store.series})
+    scores = scores[scores.index < pd.Timestamp(datetime.utcnow().date())].tail(analytics.window)
+    for date, row in scores.iterrows():
+        for name in backtest.SUB_SCORES:
+            analytics.observe("sub_score", name, date.date(), row[name])
+        analytics.observe("composite", "composite", date.date(), row["composite"])
+
+
+published_state = {"indicators": {}, "history": {}, "composite": None}
+_publish_lock = Lock()
+
+
+def publish_changes():
+    """Push whatever changed since the last publish to connected /api/stream clients.
+
+    Indicators are compared on value only so a refresh that merely bumps
+    timestamps doesn't wake every client.
+    """
+    try:
+        with _publish_lock:
+            state = dashboard_state(revalidate=False)
+            indicators = {
+                name: payload for name, payload in state["indicators"].items()
+                if published_state["indicators"].get(name, {}).get("value") != payload.get("value")
+            }
+            history = {
+                name: values for name, values in state["history"].items()
+                if published_state["history"].get(name) != values
+            }
+            composite = state["composite"]
+            old = published_state["composite"]
+            if indicators:
+                broadcaster.publish("indicators", indicators)
+            if history:
+                broadcaster.publish("history", history)
+            if composite and (old is None or composite["composite_score"] != old["composite_score"]
+                              or composite["details"] != old["details"]):
+                broadcaster.publish("composite", composite)
+            published_state.update(state)
+    except Exception as e:
+        logger.exception("[Stream] Publish error: %s", e)
+
+
+@app.route("/api/snapshot")
+def get_snapshot():
+    """Every dashboard value, sparkline history and the composite score in one response.
+
+    Served pre-encoded from the response cache with a content-hash ETag, so
+    clients revalidating with If-None-Match get a bodyless 304 until the
+    data actually changes.
+    """
+    return response_cache.respond("snapshot", dashboard_state)
+
+
+composite_history_cache = {"version": None, "payload": None}
+_composite_history_lock = Lock()
+
+
+def full_composite_history():
+    """Score history over every stored day, backtested at most once per data version."""
+    version = response_cache.version
+    with _composite_history_lock:
+        if composite_history_cache["version"] != version:
+            scores = backtest.composite_history({**fred_store.series, **yahoo_store.series})
+            composite_history_cache.update(version=version, payload={
+                "dates": [d.strftime("%Y-%m-%d") for d in scores.index],
+                **{column: scores[column].round(2).tolist() for column in scores.columns},
+            })
+        return composite_history_cache["payload"]
+
+
+def composite_history_payload(start=None):
+    full = full_composite_history()
+    first = bisect_left(full["dates"], start) if start else 0
+    return {key: values[first:] for key, values in full.items()}
+
+
+@app.route("/api/composite_history")
+def get_composite_history():
+    """Daily composite score and sub-scores over the full stored history (?start=YYYY-MM-DD)."""
+    start = request.args.get("start")
+    try:
+        if start:
+            datetime.strptime(start, "%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "start must be YYYY-MM-DD"}), 400
+    return response_cache.respond(("composite_history", start), lambda: composite_history_payload(start))
+
+
+@app.route("/api/analytics")
+def get_analytics():
+    """Rolling z-score, percentile and EWMA for every indicator, sub-score and the composite."""
+    return response_cache.respond("analytics", analytics.summary)
+
+
+@app.route("/api/alerts")
+def get_alerts():
+    """Recent regime-change alerts, newest last; live ones arrive as "alert" events on /api/stream."""
+    return jsonify({"regime": analytics.regime.label, "alerts": list(analytics.alerts)})
+
+
+@app.route("/api/stream")
+def stream():
+    """Server-sent events: a full snapshot on connect, then diffs as the refresher updates data.
+
+    Pass ?snapshot=0 to skip the initial snapshot.
+    """
+    initial = []
+    if request.args.get("snapshot", "1") != "0":
+        initial.append(format_sse("snapshot", dashboard_state()))
+    response = Response(broadcaster.stream(initial), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 if __name__ == "__main__":
     start_background_updaters()
     app.run(host="127.0.0.1", port=5000)
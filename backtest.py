@@ -0,0 +1,190 @@
+# backtest.py
+"""Vectorized composite stress score over full daily histories.
+
+Evaluates the same sub-score formulas as the live score in app.py, but
+over an aligned daily frame of every input at once.
+
+    python backtest.py --output composite_history.csv
+"""
+import argparse
+import os
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from series_store import yoy
+
+WEIGHTS = {
+    "rates_and_curve": 0.15,  # Reduced weight
+    "credit_and_volatility": 0.40,  # Increased weight
+    "macro_indicators": 0.25,
+    "flight_to_safety": 0.20,
+}
+
+# Score input name -> FRED series id / Yahoo symbol, as used by update_composite_score.
+FRED_INPUTS = {
+    "two_year_yield": "DGS2",
+    "ten_year_yield": "DGS10",
+    "thirty_year_yield": "DGS30",
+    "fed_funds_rate": "FEDFUNDS",
+    "unemployment_rate": "UNRATE",
+    "retail_sales": "RSAFS",
+    "hy_credit_spread": "BAMLH0A0HYM2EY",
+}
+YAHOO_INPUTS = {
+    "vix": "^VIX",
+    "move_index": "^MOVE",
+    "vx_tlt": "^VXTLT",
+    "gold_price": "GC=F",
+    "bitcoin_price": "BTC-USD",
+}
+SUB_SCORES = list(WEIGHTS)
+
+
+def required_series():
+    return set(FRED_INPUTS.values()) | {"TB3MS", "SOFR", "EFFR", "CPIAUCSL"} | set(YAHOO_INPUTS.values())
+
+
+def build_inputs(series):
+    """Align raw series ({sid or symbol: Series}) into one business-day frame of score inputs.
+
+    Lower-frequency series are forward-filled; inputs with no data yet are 0,
+    matching the defaults of the live score in app.py.
+    """
+    columns = {}
+    for name, key in {**FRED_INPUTS, **YAHOO_INPUTS}.items():
+        if series.get(key) is not None:
+            columns[name] = series[key]
+    for key in ["TB3MS", "SOFR", "EFFR"]:
+        if series.get(key) is not None:
+            columns[key] = series[key]
+    if series.get("CPIAUCSL") is not None:
+        columns["cpi_yoy"] = yoy(series["CPIAUCSL"])
+    if not columns:
+        return pd.DataFrame()
+
+    frame = pd.concat(columns, axis=1, sort=True)
+    frame = frame[~frame.index.duplicated(keep="last")]
+    days = pd.bdate_range(frame.index[0], frame.index[-1])
+    frame = frame.reindex(frame.index.union(days)).ffill().reindex(days)
+
+    def col(name):
+        return frame[name] if name in frame else pd.Series(np.nan, index=frame.index)
+
+    frame["ust_2s10s_curve"] = col("ten_year_yield") - col("two_year_yield")
+    frame["ust_3m10y_curve"] = col("ten_year_yield") - col("TB3MS")
+    frame["sofr_spread"] = col("SOFR") - col("EFFR")
+    inputs = list(FRED_INPUTS) + list(YAHOO_INPUTS) + ["cpi_yoy", "ust_2s10s_curve", "ust_3m10y_curve", "sofr_spread"]
+    return frame.reindex(columns=inputs).fillna(0.0)
+
+
+def _clip(values):
+    return np.clip(values, 0, 100)
+
+
+# Sub-score formulas. Each takes a mapping of score inputs to scalars or
+# equal-length arrays, so app.py's live score and score_frame() share them.
+
+def rates_and_curve(d):
+    curve_inversion_score = _clip((0.5 - d["ust_2s10s_curve"]) * 300)  # Penalize near-zero or barely positive spreads
+    rates_score = _clip((d["two_year_yield"] + d["ten_year_yield"] + d["thirty_year_yield"] - 9) * 15)
+    return (curve_inversion_score + rates_score) / 2
+
+
+def credit_and_volatility(d):
+    vix_score = _clip((d["vix"] - 15) * 6)
+    move_score = _clip((d["move_index"] - 100) * 2)  # MOVE > 150 = 100
+    credit_spread_score = _clip(d["hy_credit_spread"] * 15)
+    return (vix_score + move_score + credit_spread_score + d["vx_tlt"]) / 4
+
+
+def macro_indicators(d):
+    unemployment_score = _clip((d["unemployment_rate"] - 3) * 30)
+    inflation_score = _clip((d["cpi_yoy"] - 2) * 50)  # CPI > 2 = stress
+    retail_sales_score = _clip(100 - (d["retail_sales"] / 8000))
+    return (inflation_score + unemployment_score + retail_sales_score + d["fed_funds_rate"]) / 4
+
+
+def flight_to_safety(d):
+    gold_score = _clip((d["gold_price"] - 1800) / 1.5)
+    bitcoin_score = _clip((60000 - d["bitcoin_price"]) / 400)
+    return (gold_score + bitcoin_score) / 2
+
+
+SUB_SCORE_FUNCTIONS = {
+    "rates_and_curve": rates_and_curve,
+    "credit_and_volatility": credit_and_volatility,
+    "macro_indicators": macro_indicators,
+    "flight_to_safety": flight_to_safety,
+}
+
+
+def score_frame(inputs):
+    """Sub-scores and composite for every row of an input frame from build_inputs()."""
+    d = {name: inputs[name].to_numpy(dtype=float) for name in inputs.columns}
+    scores = pd.DataFrame({name: fn(d) for name, fn in SUB_SCORE_FUNCTIONS.items()}, index=inputs.index)
+    composite = sum(WEIGHTS[name] * scores[name] for name in SUB_SCORES)
+    scores["composite"] = composite.round(2)
+    return scores
+
+
+def composite_history(series):
+    inputs = build_inputs(series)
+    if inputs.empty:
+        return pd.DataFrame(columns=SUB_SCORES + ["composite"], index=pd.DatetimeIndex([]))
+    return score_frame(inputs)
+
+
+def _load_series(fetch):
+    from snapshot_store import SnapshotStore
+
+    series = {}
+    for key, values in SnapshotStore().load_series().items():
+        series[key.split(":", 1)[-1]] = values
+    missing = required_series() - set(series)
+    if missing and fetch:
+        from dotenv import load_dotenv
+        from fredapi import Fred
+        import yfinance as yf
+        from fred_fetcher import FredFetcher
+
+        load_dotenv()
+        fetcher = FredFetcher(Fred(api_key=os.getenv("FRED_API_KEY")))
+        series.update(fetcher.fetch_many(missing - set(YAHOO_INPUTS.values())))
+        symbols = sorted(missing & set(YAHOO_INPUTS.values()))
+        if symbols:
+            data = yf.download(symbols, period="max", interval="1d", group_by="ticker",
+                               auto_adjust=False, progress=False)
+            for symbol in symbols:
+                if symbol in data.columns.get_level_values(0):
+                    closes = data[symbol]["Close"].dropna()
+                    closes.index = pd.DatetimeIndex(closes.index).tz_localize(None).normalize()
+                    series[symbol] = closes
+    return series
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the composite stress score over full history.")
+    parser.add_argument("--output", help="write the score series to this CSV file")
+    parser.add_argument("--no-fetch", action="store_true",
+                        help="only use series already in the snapshot database")
+    args = parser.parse_args()
+
+    series = _load_series(fetch=not args.no_fetch)
+    start = perf_counter()
+    scores = composite_history(series)
+    elapsed = perf_counter() - start
+    if scores.empty:
+        print("No series available to score.")
+        return
+    print(f"Scored {len(scores)} days ({scores.index[0].date()} to {scores.index[-1].date()}) "
+          f"in {elapsed * 1000:.1f} ms")
+    print(scores.tail())
+    if args.output:
+        scores.to_csv(args.output, index_label="date")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
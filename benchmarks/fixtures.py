@@ -0,0 +1,170 @@
+# benchmarks/fixtures.py
+"""Recorded (or synthetic) upstream data and replay clients for benchmarks.
+
+A fixture is one gzipped JSON document:
+
+    {"source": "recorded" | "synthetic",
+     "recorded_at": "...",  # recorded fixtures only
+     "fred":    {sid: {"dates": [...], "values": [...]}},
+     "yahoo":   {symbol: {"dates": [...], "values": [...]}},
+     "twitter": {"users": {username: user_id}, "tweets": {user_id: [{"id", "text", "created_at"}]}}}
+
+record_fixtures.py writes one from the live APIs (it needs FRED and
+Twitter keys, so none is committed); synthetic() builds the deterministic
+stand-in the suite uses by default, with no network or keys.
+The replay clients mimic just the parts of fredapi.Fred, the yfinance
+module and tweepy.Client that the dashboard calls, optionally sleeping
+`latency` seconds per call to model the network.
+"""
+import gzip
+import json
+import os
+from datetime import datetime
+from time import sleep
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "upstream.json.gz")
+
+MONTHLY_FRED = {"FEDFUNDS", "UNRATE", "CPIAUCSL", "RSAFS", "TB3MS"}
+LEVELS = {
+    "DGS2": 4.0, "DGS10": 4.2, "DGS30": 4.4, "SOFR": 5.3, "EFFR": 5.3, "BAMLH0A0HYM2EY": 7.5,
+    "FEDFUNDS": 5.3, "UNRATE": 4.0, "CPIAUCSL": 310.0, "RSAFS": 700000.0, "TB3MS": 5.2,
+    "^VIX": 17.0, "^MOVE": 110.0, "^VVIX": 90.0, "^VXTLT": 15.0, "^SKEW": 140.0,
+    "GC=F": 2300.0, "BTC-USD": 60000.0, "DX-Y.NYB": 104.0,
+}
+SYNTHETIC_START = "2000-01-03"
+
+
+def series_to_json(series):
+    series = series.dropna()
+    return {"dates": [d.strftime("%Y-%m-%d") for d in series.index],
+            "values": [float(v) for v in series.to_numpy()]}
+
+
+def series_from_json(data):
+    return pd.Series(data["values"], index=pd.DatetimeIndex(data["dates"]), dtype=float)
+
+
+def save(fixture, path=FIXTURE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wt") as f:
+        json.dump(fixture, f)
+
+
+def load(path=FIXTURE_PATH):
+    """The recorded fixture at `path`, or None if there isn't one."""
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt") as f:
+        return json.load(f)
+
+
+def _random_walk(rng, dates, level, vol):
+    steps = rng.normal(0, vol, len(dates))
+    return pd.Series(level * np.exp(np.cumsum(steps) - np.cumsum(steps)[-1]), index=dates)
+
+
+def synthetic(fred_series, yahoo_symbols, usernames, seed=0):
+    """Deterministic fixture with full-length daily/monthly histories ending today."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(datetime.utcnow().date())
+    daily = pd.bdate_range(SYNTHETIC_START, end)
+    monthly = pd.date_range(SYNTHETIC_START, end, freq="MS")
+    fixture = {"source": "synthetic", "fred": {}, "yahoo": {}, "twitter": {"users": {}, "tweets": {}}}
+    for sid in sorted(fred_series):
+        dates = monthly[:-1] if sid in MONTHLY_FRED else daily
+        vol = 0.003 if sid in MONTHLY_FRED else 0.01
+        fixture["fred"][sid] = series_to_json(_random_walk(rng, dates, LEVELS.get(sid, 3.0), vol))
+    for symbol in sorted(yahoo_symbols):
+        fixture["yahoo"][symbol] = series_to_json(_random_walk(rng, daily, LEVELS.get(symbol, 100.0), 0.015))
+    for n, username in enumerate(sorted(usernames), start=1):
+        user_id = str(1000 + n)
+        fixture["twitter"]["users"][username] = user_id
+        fixture["twitter"]["tweets"][user_id] = [
+            {"id": str(10 ** 18 + n * 100 + i), "text": f"Synthetic tweet {i} from {username}",
+             "created_at": (end - pd.Timedelta(hours=i)).isoformat()}
+            for i in range(10, 0, -1)
+        ]
+    return fixture
+
+
+class ReplayFred:
+    def __init__(self, fixture, latency=0.0):
+        self.series = {sid: series_from_json(data) for sid, data in fixture["fred"].items()}
+        self.latency = latency
+        self.calls = 0
+
+    def get_series(self, series_id, observation_start=None, **kwargs):
+        self.calls += 1
+        sleep(self.latency)
+        if series_id not in self.series:
+            raise ValueError(f"Bad Request.  The series does not exist. ({series_id})")
+        series = self.series[series_id]
+        if observation_start is not None:
+            series = series[series.index >= pd.Timestamp(observation_start)]
+        return series.copy()
+
+
+PERIODS = {"1d": 1, "2d": 2, "5d": 5, "1mo": 23, "3mo": 65, "1y": 252}
+
+
+class ReplayYahoo:
+    """Stands in for the `yf` module: download() and Ticker().history()."""
+
+    def __init__(self, fixture, latency=0.0):
+        self.series = {symbol: series_from_json(data) for symbol, data in fixture["yahoo"].items()}
+        self.latency = latency
+        self.calls = 0
+
+    def _closes(self, symbol, period):
+        series = self.series.get(symbol)
+        if series is None:
+            return None
+        return series if period == "max" else series.iloc[-PERIODS.get(period, 1):]
+
+    def download(self, symbols, period="1mo", **kwargs):
+        self.calls += 1
+        sleep(self.latency)
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        frames = {s: pd.DataFrame({"Close": self._closes(s, period)}) for s in symbols if s in self.series}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def Ticker(self, symbol):
+        def history(period="1mo", **kwargs):
+            self.calls += 1
+            sleep(self.latency)
+            closes = self._closes(symbol, period)
+            return pd.DataFrame({"Close": closes}) if closes is not None else pd.DataFrame()
+        return SimpleNamespace(history=history)
+
+
+class ReplayTwitter:
+    """Stands in for tweepy.Client: get_users() and get_users_tweets() with since_id."""
+
+    def __init__(self, fixture, latency=0.0):
+        self.users = fixture["twitter"]["users"]
+        self.tweets = fixture["twitter"]["tweets"]
+        self.latency = latency
+        self.calls = 0
+
+    def get_users(self, usernames, **kwargs):
+        self.calls += 1
+        sleep(self.latency)
+        lookup = {name.lower(): (name, uid) for name, uid in self.users.items()}
+        found = [lookup[u.lower()] for u in usernames if u.lower() in lookup]
+        return SimpleNamespace(data=[SimpleNamespace(id=uid, username=name) for name, uid in found])
+
+    def get_users_tweets(self, id, since_id=None, max_results=5, **kwargs):
+        self.calls += 1
+        sleep(self.latency)
+        tweets = [t for t in self.tweets.get(str(id), []) if not since_id or int(t["id"]) > int(since_id)]
+        tweets = sorted(tweets, key=lambda t: int(t["id"]), reverse=True)[:max_results]
+        data = [SimpleNamespace(id=int(t["id"]), text=t["text"],
+                                created_at=datetime.fromisoformat(t["created_at"])) for t in tweets]
+        meta = {"newest_id": tweets[0]["id"]} if tweets else {"result_count": 0}
+        return SimpleNamespace(data=data or None, meta=meta)
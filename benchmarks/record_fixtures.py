@@ -0,0 +1,63 @@
+# benchmarks/record_fixtures.py
+"""Record live FRED, Yahoo and Twitter responses into the benchmark fixture.
+
+Needs FRED_API_KEY (and TWITTER_BEARER_TOKEN for tweets) in the
+environment or .env; run from anywhere:
+
+    python benchmarks/record_fixtures.py [--output path] [--no-twitter]
+
+Records every series and symbol the configured indicators use, so the
+replay clients can serve a full cold start offline.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=fixtures.FIXTURE_PATH)
+    parser.add_argument("--no-twitter", action="store_true", help="skip recording tweets")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)  # app.py reads config.json relative to the working directory
+    import app
+    import yfinance as yf
+
+    fixture = {"source": "recorded", "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+               "fred": {}, "yahoo": {}, "twitter": {"users": {}, "tweets": {}}}
+    for sid in sorted(app.fred_series_ids()):
+        fixture["fred"][sid] = fixtures.series_to_json(app.fred.get_series(sid))
+        print(f"FRED {sid}: {len(fixture['fred'][sid]['dates'])} observations")
+    for symbol in app.yahoo_symbols():
+        closes = yf.Ticker(symbol).history(period="max", interval="1d")["Close"]
+        closes.index = closes.index.tz_localize(None).normalize()
+        fixture["yahoo"][symbol] = fixtures.series_to_json(closes)
+        print(f"Yahoo {symbol}: {len(fixture['yahoo'][symbol]['dates'])} closes")
+
+    if not args.no_twitter:
+        client = app.tweet_feed.client
+        users = client.get_users(usernames=app.tweet_feed.usernames).data or []
+        for user in users:
+            response = client.get_users_tweets(id=user.id, max_results=10, tweet_fields=["created_at"])
+            fixture["twitter"]["users"][user.username] = str(user.id)
+            fixture["twitter"]["tweets"][str(user.id)] = [
+                {"id": str(t.id), "text": t.text, "created_at": t.created_at.isoformat()}
+                for t in response.data or []
+            ]
+            print(f"Twitter @{user.username}: {len(response.data or [])} tweets")
+
+    fixtures.save(fixture, args.output)
+    print(f"Wrote {args.output}")
+    os._exit(0)  # the app's worker pools are not daemonic
+
+
+if __name__ == "__main__":
+    main()
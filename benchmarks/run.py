@@ -0,0 +1,363 @@
+# benchmarks/run.py
+"""Offline benchmarks for the dashboard backend.
+
+Nothing here touches FRED, Yahoo or Twitter: upstream calls are served by
+replay clients. By default they replay a deterministic synthetic fixture
+(random walks over the configured series), since no recorded data ships
+with the repo. To benchmark against real upstream data, record it first:
+
+    python benchmarks/record_fixtures.py          # writes benchmarks/fixtures/upstream.json.gz
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --quick --baseline results.json   # exits 1 on regression
+
+A recorded fixture at the default path (or --fixture PATH) is used when
+present; --synthetic ignores it. Results record which one was used in
+meta.fixture, and a baseline is only compared against results from the
+same fixture.
+
+Measures:
+  cold_start  start_background_updaters() in a fresh process, with an empty
+              snapshot (cold) and with the snapshot the cold run left (warm)
+  endpoints   latency percentiles and throughput of the hot API endpoints
+              under concurrent load against a real threaded HTTP server
+  composite   composite score compute cost: scalar score, full and no-op
+              ScoreGraph recompute, the data_changed pipeline and the
+              vectorized backtest
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Thread
+from time import perf_counter, sleep
+
+ROOT = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+
+ENDPOINTS = {
+    "indicator_yahoo": "/api/indicator/VIX",
+    "indicator_fred": "/api/indicator/2-Year%20Yield",
+    "history": "/api/history/VIX",
+    "history_range": "/api/history/VIX?range=max&points=200",
+    "composite_score": "/api/composite_score",
+}
+CONCURRENCY = [1, 8, 32]
+COMPARED = ("mean_ms", "p50_ms", "p90_ms", "rps")  # p99/max are too noisy at these run counts
+MIN_COMPARED_MS = 0.05  # sub-50us timings are dominated by timer and scheduler noise
+READY_TIMEOUT_SECONDS = 120
+
+
+def prepare_env(state_dir, latency):
+    """Point every on-disk artifact at `state_dir` and quiet logging; call before importing app."""
+    os.environ.setdefault("FRED_API_KEY", "0" * 32)  # fredapi refuses to construct without one
+    os.environ.setdefault("TWITTER_BEARER_TOKEN", "replay")
+    os.environ["SNAPSHOT_DB_PATH"] = os.path.join(state_dir, "snapshot.db")
+    os.environ["REFRESHER_LOCK_PATH"] = os.path.join(state_dir, "snapshot.db.lock")
+    os.environ["MARKET_SUMMARY_PATH"] = os.path.join(state_dir, "market_summary.json")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["BENCH_UPSTREAM_LATENCY"] = str(latency)
+    os.environ.setdefault("BENCH_FIXTURE", fixtures.FIXTURE_PATH)
+
+
+def import_app():
+    """Import app with every upstream client swapped for a replay client."""
+    os.chdir(ROOT)  # app.py reads config.json relative to the working directory
+    import app
+    path = os.environ.get("BENCH_FIXTURE")
+    fixture = fixtures.load(path) if path else None
+    if fixture is None:
+        fixture = fixtures.synthetic(app.fred_series_ids(), app.yahoo_symbols(), app.tweet_feed.usernames)
+    latency = float(os.environ.get("BENCH_UPSTREAM_LATENCY", 0))
+    clients = {
+        "fred": fixtures.ReplayFred(fixture, latency),
+        "yahoo": fixtures.ReplayYahoo(fixture, latency),
+        "twitter": fixtures.ReplayTwitter(fixture, latency),
+    }
+    app.fred = app.fred_fetcher.fred = clients["fred"]
+    app.yf = clients["yahoo"]
+    app.tweet_feed.client = clients["twitter"]
+    return app, clients, fixture_label(fixture)
+
+
+def fixture_label(fixture):
+    """"synthetic", or "recorded <timestamp>" so baselines from different recordings don't mix."""
+    if fixture["source"] == "synthetic":
+        return "synthetic"
+    return f"recorded {fixture.get('recorded_at', 'unknown')}"
+
+
+def timings(samples):
+    samples = sorted(samples)
+    n = len(samples)
+    pick = lambda q: samples[min(n - 1, int(q * n))] * 1000  # noqa: E731
+    return {
+        "runs": n,
+        "mean_ms": round(sum(samples) / n * 1000, 4),
+        "p50_ms": round(pick(0.50), 4),
+        "p90_ms": round(pick(0.90), 4),
+        "p99_ms": round(pick(0.99), 4),
+        "max_ms": round(samples[-1] * 1000, 4),
+    }
+
+
+def time_calls(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = perf_counter()
+        fn()
+        samples.append(perf_counter() - start)
+    return timings(samples)
+
+
+# --- cold start (runs in a child process) ---
+
+def child_start():
+    start = perf_counter()
+    app, clients, source = import_app()
+    imported = perf_counter()
+    app.start_background_updaters()
+    returned = perf_counter()
+    expected = app.fred_series_ids()
+    while perf_counter() - returned < READY_TIMEOUT_SECONDS:
+        if app.composite_score_cache.get("value") is not None and expected <= set(app.fred_cache):
+            break
+        sleep(0.005)
+    ready = perf_counter()
+    print(json.dumps({
+        "import_ms": round((imported - start) * 1000, 2),
+        "start_background_updaters_ms": round((returned - imported) * 1000, 2),
+        "time_to_ready_ms": round((ready - imported) * 1000, 2),
+        "ready": app.composite_score_cache.get("value") is not None,
+        "role": app.updater_role,
+        "upstream_calls": {name: client.calls for name, client in clients.items()},
+        "fixture": source,
+    }))
+    sys.stdout.flush()
+    os._exit(0)  # refresher and pool threads are not all daemonic
+
+
+def bench_cold_start(state_dir):
+    results = {}
+    for phase in ["cold", "warm"]:  # warm reuses the snapshot the cold run wrote
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child-start", "--state-dir", state_dir],
+                             capture_output=True, text=True, env=os.environ, timeout=READY_TIMEOUT_SECONDS + 60)
+        if out.returncode != 0:
+            raise RuntimeError(f"{phase} start failed:\n{out.stderr}")
+        results[phase] = json.loads(out.stdout.strip().splitlines()[-1])
+    return results
+
+
+# --- endpoint load ---
+
+def serve(app):
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # werkzeug forces INFO access logs otherwise
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_test(port, path, concurrency, total):
+    def worker(count):
+        samples, errors = [], 0
+        for _ in range(count):
+            start = perf_counter()
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+                resp = conn.getresponse()
+                resp.read()
+                conn.close()
+                if resp.status != 200:
+                    errors += 1
+            except OSError:
+                errors += 1
+            samples.append(perf_counter() - start)
+        return samples, errors
+
+    shares = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, shares))
+    elapsed = perf_counter() - start
+    samples = [s for r in results for s in r[0]]
+    return {
+        "concurrency": concurrency,
+        **timings(samples),
+        "errors": sum(r[1] for r in results),
+        "rps": round(len(samples) / elapsed, 1),
+    }
+
+
+def bench_endpoints(app, requests_per_level, concurrency_levels):
+    server = serve(app)
+    try:
+        results = {}
+        for name, path in ENDPOINTS.items():
+            load_test(server.port, path, 1, 20)  # warm the response cache and connections
+            results[name] = {"path": path, "levels": [
+                load_test(server.port, path, c, requests_per_level) for c in concurrency_levels
+            ]}
+        return results
+    finally:
+        server.shutdown()
+
+
+# --- composite compute ---
+
+def bench_composite(app, runs):
+    every_sub_score = set(app.score_graph.normalizers)
+
+    def full_recompute():
+        app.score_graph.dirty = set(every_sub_score)
+        app.score_graph.recompute(app.gather_score_inputs)
+
+    series = {**app.fred_store.series, **app.yahoo_store.series}
+    backtest_runs = max(3, runs // 100)
+    scores = app.backtest.composite_history(series)
+    return {
+        "scalar_score": time_calls(lambda: app.calculate_composite_score(app.gather_score_inputs()), runs),
+        "score_graph_full": time_calls(full_recompute, runs),
+        "score_graph_noop": time_calls(lambda: app.score_graph.recompute(app.gather_score_inputs), runs),
+        "data_changed": time_calls(app.data_changed, max(10, runs // 10)),
+        "backtest": {**time_calls(lambda: app.backtest.composite_history(series), backtest_runs),
+                     "days": len(scores)},
+    }
+
+
+# --- baseline comparison ---
+
+def flatten(results, prefix=""):
+    """{"endpoints.history.c8.p50_ms": 1.2, ...} for every latency / throughput number."""
+    flat = {}
+    for key, value in results.items():
+        if key in ("meta", "regressions"):
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict) and "concurrency" in item:
+                    flat.update(flatten(item, f"{name}.c{item['concurrency']}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and \
+                (key.endswith("_ms") or key == "rps"):
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Metrics more than `tolerance` (fractional) worse than the baseline."""
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    for name, old in previous.items():
+        new = current.get(name)
+        if new is None or old <= 0 or not name.endswith(COMPARED):
+            continue
+        if name.endswith("_ms") and old < MIN_COMPARED_MS:
+            continue
+        higher_is_better = name.endswith("rps")
+        change = (old - new) / old if higher_is_better else (new - old) / old
+        if change > tolerance:
+            regressions.append({"metric": name, "baseline": old, "current": new, "change": round(change, 3)})
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the dashboard backend.")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON to compare against; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional slowdown (default 0.25)")
+    parser.add_argument("--quick", action="store_true", help="fewer requests and runs")
+    parser.add_argument("--requests", type=int, help="requests per endpoint and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0,
+                        help="simulated network latency per upstream call")
+    parser.add_argument("--skip", nargs="+", default=[], choices=["cold_start", "endpoints", "composite"])
+    parser.add_argument("--fixture", default=fixtures.FIXTURE_PATH,
+                        help="recorded fixture to replay (default: %(default)s, synthetic if missing)")
+    parser.add_argument("--synthetic", action="store_true", help="replay synthetic data even if a recording exists")
+    parser.add_argument("--child-start", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--state-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_start:
+        prepare_env(args.state_dir, float(os.environ.get("BENCH_UPSTREAM_LATENCY", 0)))
+        child_start()
+
+    requests_per_level = args.requests or (200 if args.quick else 1000)
+    runs = 100 if args.quick else 1000
+    state_dir = tempfile.mkdtemp(prefix="dashboard-bench-")
+    os.environ["BENCH_FIXTURE"] = "" if args.synthetic else args.fixture
+    prepare_env(state_dir, args.upstream_latency_ms / 1000)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {"meta": {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "upstream_latency_ms": args.upstream_latency_ms,
+        "requests_per_level": requests_per_level,
+    }}
+    if "cold_start" not in args.skip:
+        results["cold_start"] = bench_cold_start(tempfile.mkdtemp(prefix="dashboard-bench-start-"))
+
+    app, clients, source = import_app()
+    results["meta"]["fixture"] = source
+    if source == "synthetic":
+        print("Using the synthetic fixture; run benchmarks/record_fixtures.py to replay real data",
+              file=sys.stderr)
+    if baseline is not None and baseline.get("meta", {}).get("fixture") != source:
+        print(f"Baseline was run on fixture {baseline.get('meta', {}).get('fixture')!r}, "
+              f"not {source!r}; refusing to compare", file=sys.stderr)
+        os._exit(2)
+    # Fill every cache synchronously, as the refresher's first pass would
+    app.run_due_jobs([("yahoo",), ("tweets",)] + [("fred", sid) for sid in app.fred_series_ids()])
+    if "endpoints" not in args.skip:
+        results["endpoints"] = bench_endpoints(app, requests_per_level, args.concurrency)
+    if "composite" not in args.skip:
+        results["composite"] = bench_composite(app, runs)
+
+    exit_code = 0
+    if baseline is not None:
+        results["regressions"] = compare(results, baseline, args.tolerance)
+        exit_code = 1 if results["regressions"] else 0
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for regression in results.get("regressions", []):
+        print(f"REGRESSION {regression['metric']}: {regression['baseline']} -> {regression['current']}",
+              file=sys.stderr)
+    sys.stdout.flush()
+    os._exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
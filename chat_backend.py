@@ -0,0 +1,154 @@
+# chat_backend.py
+"""Streaming answers from an OpenAI-compatible chat completions API.
+
+Any server speaking the /chat/completions streaming protocol works, so
+CHAT_API_BASE can point at mock_chat_server.py in development.
+
+- Each session may have at most `max_per_session` prompts in flight.
+- Identical prompts (same normalized text and context) already in flight
+  share one upstream request; later callers replay what has streamed so
+  far and then follow it live.
+- Completed answers are cached for `cache_ttl_seconds`, so the common
+  dashboard questions are answered without touching the model.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+from session_store import TTLCache
+
+CHAT_API_BASE = os.getenv("CHAT_API_BASE", "https://api.openai.com/v1")
+CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-4o-mini")
+MAX_PER_SESSION = 2
+MAX_UPSTREAM = 8
+CACHE_TTL_SECONDS = 300
+CACHE_MAX_ENTRIES = 256
+
+SYSTEM_PROMPT = (
+    "You are the assistant on a market-risk dashboard. Answer questions about "
+    "the dashboard's indicators and the composite risk score concisely."
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InflightAnswer:
+    """Chunks of one upstream answer, replayable by any number of followers."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Event()
+        self.task = None  # the producer; the event loop only keeps a weak reference
+
+    def push(self, chunk):
+        self.chunks.append(chunk)
+        self._wake()
+
+    def finish(self, error=None):
+        self.done = True
+        self.error = error
+        self._wake()
+
+    def _wake(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def follow(self):
+        sent = 0
+        while True:
+            changed = self.changed
+            while sent < len(self.chunks):
+                yield self.chunks[sent]
+                sent += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+
+class ChatBackend:
+    def __init__(self, client, base_url=CHAT_API_BASE, api_key=None, model=CHAT_MODEL,
+                 max_per_session=MAX_PER_SESSION, max_upstream=MAX_UPSTREAM,
+                 cache_ttl_seconds=CACHE_TTL_SECONDS, cache_max_entries=CACHE_MAX_ENTRIES):
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.max_per_session = max_per_session
+        self.upstream = asyncio.Semaphore(max_upstream)
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.answers = TTLCache(cache_max_entries)
+        self.inflight = {}  # prompt key -> InflightAnswer
+        self.session_slots = {}  # session_id -> [Semaphore, holders]
+
+    def prompt_key(self, prompt, context):
+        normalized = " ".join(prompt.lower().split())
+        return hashlib.sha1(json.dumps([self.model, normalized, context]).encode()).hexdigest()
+
+    async def stream(self, session_id, prompt, context=None):
+        """Yield the answer to `prompt` in chunks as they arrive."""
+        key = self.prompt_key(prompt, context)
+        answer = self.answers.get(key)
+        if answer is not None:
+            yield answer
+            return
+        slot = self.session_slots.setdefault(session_id, [asyncio.Semaphore(self.max_per_session), 0])
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                inflight = self.inflight.get(key)
+                if inflight is None:
+                    inflight = self.inflight[key] = InflightAnswer()
+                    # A separate task, so followers still get the answer if this caller disconnects
+                    inflight.task = asyncio.ensure_future(self._produce(key, prompt, context, inflight))
+                async for chunk in inflight.follow():
+                    yield chunk
+        finally:
+            slot[1] -= 1
+            if slot[1] == 0:
+                self.session_slots.pop(session_id, None)
+
+    async def answer(self, session_id, prompt, context=None):
+        return "".join([chunk async for chunk in self.stream(session_id, prompt, context)])
+
+    def messages(self, prompt, context):
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if context:
+            messages.append({"role": "system", "content": context})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def _produce(self, key, prompt, context, inflight):
+        try:
+            async with self.upstream:
+                async for chunk in self._complete(self.messages(prompt, context)):
+                    inflight.push(chunk)
+            self.answers.put(key, "".join(inflight.chunks), self.cache_ttl_seconds)
+            inflight.finish()
+        except Exception as e:
+            logger.warning("Chat completion failed: %s", e)
+            inflight.finish(e)
+        finally:
+            self.inflight.pop(key, None)
+
+    async def _complete(self, messages):
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        body = {"model": self.model, "messages": messages, "stream": True}
+        async with self.client.stream("POST", f"{self.base_url}/chat/completions",
+                                      json=body, headers=headers) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                choices = json.loads(data).get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
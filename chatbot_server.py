@@ -1,34 +1,73 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse, RedirectResponse
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
 import os
 import httpx
 import jwt
-import json
-import redis
 import logging
 import asyncio
-from jwt.algorithms import RSAAlgorithm
 import datetime
 
+import log_config
+from session_store import SessionStore, create_redis
+from jwks_cache import JWKSCache
+from chat_backend import ChatBackend
+from market_summary import SummaryReader
+
 # Load config
 load_dotenv()
 COGNITO_DOMAIN = os.getenv("COGNITO_DOMAIN")
 COGNITO_APP_CLIENT_ID = os.getenv("COGNITO_APP_CLIENT_ID")
 COGNITO_USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID")
 REDIRECT_URI = os.getenv("REDIRECT_URI")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+JWKS_URL = f"https://cognito-idp.us-east-1.amazonaws.com/{COGNITO_USER_POOL_ID}/.well-known/jwks.json"
+# Pages allowed to open /ws; the session cookie alone would let any site's page in
+ALLOWED_ORIGINS = set(filter(None, os.getenv(
+    "ALLOWED_ORIGINS", "https://iamcalledned.ai,https://www.iamcalledned.ai").split(",")))
 
 # Redis Setup
-redis_client = redis.Redis(host="localhost", port=6379, db=0)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+redis_client = create_redis(REDIS_URL)
+sessions = SessionStore(redis_client)
+
+# One pooled keep-alive client for Cognito, opened and closed with the app
+http_client = None
+jwks = JWKSCache(JWKS_URL)
+chat_backend = None
+market_summary = SummaryReader()
 
 # Logging
-logging.basicConfig(level=logging.INFO)
+log_config.configure_logging()
+logger = logging.getLogger(__name__)
 
 # FastAPI app
 app = FastAPI()
 app.add_middleware(SessionMiddleware, secret_key=os.urandom(24).hex())
 
+
+@app.on_event("startup")
+async def open_http_client():
+    global http_client, chat_backend
+    http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(10.0, read=60.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+    chat_backend = ChatBackend(http_client, api_key=OPENAI_API_KEY)
+    # Warm the key cache so the first login only pays for the token exchange
+    try:
+        await jwks.refresh(http_client)
+    except Exception as e:
+        logger.warning("JWKS prefetch failed: %s", e)
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    await http_client.aclose()
+    await redis_client.aclose()
+
+
 @app.get("/login")
 async def login(request: Request):
     state = os.urandom(24).hex()
@@ -64,8 +103,7 @@ async def callback(request: Request, code: str = "", state: str = ""):
         "code_verifier": verifier
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(token_url, headers=headers, data=data)
+    resp = await http_client.post(token_url, headers=headers, data=data)
 
     if resp.status_code != 200:
         raise HTTPException(status_code=400, detail="Token exchange failed")
@@ -81,7 +119,7 @@ async def callback(request: Request, code: str = "", state: str = ""):
     }
 
     request.session["session_id"] = session_id
-    redis_client.set(session_id, json.dumps(session_data), ex=3600)
+    await sessions.create(session_id, session_data)
 
     response = RedirectResponse(url="/chat.html")
     response.set_cookie("session_id", session_id, httponly=True)
@@ -94,25 +132,61 @@ async def chat(request: Request):
     user_input = body.get("message")
     session_id = request.cookies.get("session_id")
 
-    if not session_id or not redis_client.exists(session_id):
+    if not session_id or await sessions.get(session_id) is None:
         raise HTTPException(status_code=401, detail="Session not found or expired")
 
-    # TODO: Add real AI/LLM logic here
-    reply = f"You said: {user_input}"
+    if not user_input:
+        raise HTTPException(status_code=400, detail="Missing message")
+    try:
+        reply = await chat_backend.answer(session_id, user_input, market_summary.context())
+    except Exception:
+        raise HTTPException(status_code=502, detail="Chat backend unavailable")
     return JSONResponse(content={"response": reply})
 
 
+@app.websocket("/ws")
+async def chat_ws(websocket: WebSocket):
+    """Streaming chat: send {"message": ...}, receive "token" frames then "done" (or "error")."""
+    if websocket.headers.get("origin") not in ALLOWED_ORIGINS:
+        await websocket.close(code=1008)
+        return
+    session_id = websocket.cookies.get("session_id")
+    if not session_id or await sessions.get(session_id) is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            body = await websocket.receive_json()
+            message = body.get("message") if isinstance(body, dict) else None
+            if not message:
+                await websocket.send_json({"type": "error", "message": "Missing message"})
+                continue
+            try:
+                async for chunk in chat_backend.stream(session_id, message, market_summary.context()):
+                    await websocket.send_json({"type": "token", "data": chunk})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.warning("Chat stream failed: %s", e)
+                await websocket.send_json({"type": "error", "message": "Chat backend unavailable"})
+                continue
+            await websocket.send_json({"type": "done"})
+    except WebSocketDisconnect:
+        pass
+
+
 @app.get("/get_session_data")
 async def get_session_data(request: Request):
     session_id = request.cookies.get("session_id")
     if not session_id:
         raise HTTPException(status_code=401, detail="No session cookie set")
 
-    data = redis_client.get(session_id)
-    if not data:
+    data = await sessions.get(session_id)
+    if data is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    return JSONResponse(content=json.loads(data))
+    return JSONResponse(content=data)
 
 
 @app.get("/api/status2")
@@ -126,15 +200,11 @@ async def server_status2():
 
 # Token Validation
 async def validate_token(id_token: str):
-    jwks_url = f"https://cognito-idp.us-east-1.amazonaws.com/{COGNITO_USER_POOL_ID}/.well-known/jwks.json"
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(jwks_url)
-    jwks = resp.json()
-
     headers = jwt.get_unverified_header(id_token)
-    kid = headers["kid"]
-    key = [k for k in jwks["keys"] if k["kid"] == kid][0]
-    pem = RSAAlgorithm.from_jwk(json.dumps(key))
+    try:
+        pem = await jwks.get_key(headers.get("kid"), http_client)
+    except KeyError:
+        raise HTTPException(status_code=401, detail="Unknown token signing key")
 
     decoded = jwt.decode(
         id_token,
@@ -0,0 +1,60 @@
+# event_stream.py
+import json
+from queue import Queue, Empty, Full
+from threading import Lock
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Broadcaster:
+    """Fan out server-sent events to every connected client.
+
+    Each subscriber gets its own bounded queue; a client too slow to drain
+    it is dropped rather than allowed to hold up the publisher.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = Lock()
+
+    def subscribe(self):
+        queue = Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            self.subscribers.discard(queue)
+
+    def publish(self, event, data):
+        message = format_sse(event, data)
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for queue in subscribers:
+            try:
+                queue.put_nowait(message)
+            except Full:
+                self.unsubscribe(queue)
+
+    def stream(self, initial=None):
+        """Generator of SSE frames for one client; sends `initial` frames first."""
+        queue = self.subscribe()
+        try:
+            for message in initial or []:
+                yield message
+            while True:
+                try:
+                    yield queue.get(timeout=HEARTBEAT_SECONDS)
+                except Empty:
+                    with self.lock:
+                        if queue not in self.subscribers:
+                            return  # dropped as too slow; the client reconnects
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(queue)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,111 @@
+# fred_fetcher.py
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from time import monotonic, sleep
+
+from metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# FRED allows 120 requests per minute per API key.
+FRED_REQUESTS_PER_SECOND = 2.0
+FRED_BURST = 10
+FRED_MAX_WORKERS = 8
+FRED_MAX_ATTEMPTS = 4
+FRED_BACKOFF_BASE_SECONDS = 0.5
+FRED_BACKOFF_MAX_SECONDS = 8.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+
+class FredFetcher:
+    """Fetch FRED series through a bounded thread pool.
+
+    Requests share one token bucket so a burst of series never exceeds the
+    FRED rate limit, failed calls are retried with jittered exponential
+    backoff, and per-series timings are kept in `timings` for inspection.
+    """
+
+    def __init__(self, fred, max_workers=FRED_MAX_WORKERS,
+                 rate=FRED_REQUESTS_PER_SECOND, burst=FRED_BURST,
+                 max_attempts=FRED_MAX_ATTEMPTS):
+        self.fred = fred
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max_attempts
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fred")
+        self.timings = {}
+
+    def fetch(self, sid, **kwargs):
+        start = monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            self.bucket.acquire()
+            call_start = monotonic()
+            try:
+                series = self.fred.get_series(sid, **kwargs)
+                UPSTREAM_LATENCY.observe(monotonic() - call_start, "fred")
+                self._record(sid, start, attempt, None)
+                return series
+            except Exception as e:
+                UPSTREAM_LATENCY.observe(monotonic() - call_start, "fred")
+                UPSTREAM_ERRORS.inc("fred")
+                if attempt == self.max_attempts:
+                    self._record(sid, start, attempt, e)
+                    raise
+                delay = min(FRED_BACKOFF_MAX_SECONDS, FRED_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+                delay = random.uniform(0, delay)
+                logger.info("[FRED] Retry %s in %.2fs (attempt %d): %s", sid, delay, attempt, e)
+                sleep(delay)
+
+    def fetch_many(self, series_ids, observation_starts=None, **kwargs):
+        """Fetch several series concurrently; returns {sid: series} for the ones that succeeded.
+
+        `observation_starts` optionally maps a series id to an observation_start
+        date so only observations on or after it are downloaded.
+        """
+        observation_starts = observation_starts or {}
+        futures = {}
+        for sid in series_ids:
+            sid_kwargs = dict(kwargs)
+            if observation_starts.get(sid):
+                sid_kwargs["observation_start"] = observation_starts[sid]
+            futures[sid] = self.pool.submit(self.fetch, sid, **sid_kwargs)
+        results = {}
+        for sid, future in futures.items():
+            try:
+                results[sid] = future.result()
+            except Exception as e:
+                logger.warning("[FRED] Error: %s - %s", sid, e)
+        return results
+
+    def _record(self, sid, start, attempts, error):
+        self.timings[sid] = {
+            "seconds": round(monotonic() - start, 4),
+            "attempts": attempts,
+            "ok": error is None,
+            "error": str(error) if error else None,
+            "timestamp": datetime.utcnow(),
+        }
@@ -0,0 +1,115 @@
+# history_store.py
+"""Array-backed indicator histories with cached downsampled tiers.
+
+Each indicator's full history is held as a pair of NumPy arrays (dates as
+datetime64[D], values as float64). The first query for a range slices it off
+the end and reduces it with LTTB to at most TIER_POINTS points; that tier is
+kept until the history changes, so later requests only downsample a small
+tier and ranges nobody asks for are never built.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+RANGES = {
+    "1w": timedelta(days=7),
+    "1y": timedelta(days=365),
+    "10y": timedelta(days=3652),
+    "max": None,
+}
+TIER_POINTS = 1000
+
+
+def lttb(x, y, n):
+    """Indices of `n` points chosen by Largest-Triangle-Three-Buckets from x/y (x ascending)."""
+    size = len(x)
+    if n >= size:
+        return np.arange(size)
+    if n < 3:
+        return np.array([0, size - 1])[:max(n, 1)]
+    x = x.astype(np.float64)
+    every = (size - 2) / (n - 2)
+    idx = np.empty(n, dtype=np.int64)
+    idx[0], idx[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, size)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Twice the area of the triangle (previous point, candidate, next bucket average)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+class IndicatorHistory:
+    def __init__(self, dates, values, tier_points):
+        self.dates = dates
+        self.values = values
+        self.tier_points = tier_points
+        self.tiers = {}
+
+    def tier(self, range):
+        """(dates, values) for a RANGES key, reduced to at most tier_points and cached."""
+        tier = self.tiers.get(range)
+        if tier is None:
+            # Concurrent first queries may both build it; the results are identical
+            d, v = self.window(RANGES[range])
+            keep = lttb(d.astype(np.int64), v, self.tier_points)
+            tier = self.tiers[range] = (d[keep], v[keep])
+        return tier
+
+    def window(self, span):
+        if span is None or not len(self.dates):
+            return self.dates, self.values
+        start = self.dates[-1] - np.timedelta64(span.days, "D")
+        first = np.searchsorted(self.dates, start, side="left")
+        return self.dates[first:], self.values[first:]
+
+
+class HistoryStore:
+    def __init__(self, tier_points=TIER_POINTS):
+        self.tier_points = tier_points
+        self.histories = {}
+
+    def update(self, name, series):
+        """Store a full history (pandas Series on a DatetimeIndex); returns True if it changed."""
+        series = series.dropna()
+        dates = pd.DatetimeIndex(series.index).values.astype("datetime64[D]")
+        values = series.to_numpy(dtype=np.float64)
+        old = self.histories.get(name)
+        if old is not None and np.array_equal(old.dates, dates) and np.array_equal(old.values, values):
+            return False
+        # Built off to the side and swapped in whole, so readers never see a partial update
+        self.histories[name] = IndicatorHistory(dates, values, self.tier_points)
+        return True
+
+    def query(self, name, range="max", points=None):
+        """(dates, values) for `range`, downsampled to at most `points`; None if unknown."""
+        history = self.histories.get(name)
+        if history is None:
+            return None
+        dates, values = history.tier(range)
+        if points is not None and points < len(dates):
+            keep = lttb(dates.astype(np.int64), values, points)
+            dates, values = dates[keep], values[keep]
+        return dates, values
+
+    def change(self, name, days, end=None):
+        """(latest value - value as of `days` calendar days before `end`, date of that value), or None.
+
+        `end` defaults to today (UTC). For a monthly series this is the change
+        released within the window, not month-over-month.
+        """
+        history = self.histories.get(name)
+        if history is None or not len(history.dates):
+            return None
+        start = np.datetime64(end or datetime.utcnow().date(), "D") - np.timedelta64(days, "D")
+        i = int(np.searchsorted(history.dates, start, side="right")) - 1
+        if i < 0:
+            return None
+        return float(history.values[-1] - history.values[i]), str(history.dates[i])
@@ -0,0 +1,180 @@
+# indicators.py
+"""Indicator registry compiled from the "indicators" section of config.json.
+
+Each definition names a source and an optional transform, e.g.
+
+    "UST 2s/10s Curve": {"source": "fred", "series": ["DGS2", "DGS10"], "transform": "spread"}
+
+and is compiled once at startup into a resolver object. The resolvers also
+tell the refreshers which FRED series and Yahoo symbols to fetch, so adding
+an indicator is a config change only.
+"""
+from datetime import datetime
+
+from metrics import CACHE_LOOKUPS
+
+
+def staleness(entry, ttl_seconds):
+    """Timestamp and staleness flag for a cache entry, for API responses.
+
+    Entries carrying a "stale_after" time (set from their refresh schedule)
+    use it instead of the flat TTL.
+    """
+    timestamp = (entry or {}).get("timestamp")
+    if timestamp is None:
+        return {"timestamp": None, "stale": True}
+    if entry.get("stale_after"):
+        return {"timestamp": timestamp.isoformat(), "stale": datetime.utcnow() > entry["stale_after"]}
+    age = (datetime.utcnow() - timestamp).total_seconds()
+    return {"timestamp": timestamp.isoformat(), "stale": age > ttl_seconds}
+
+
+def yoy_key(sid):
+    """fred_cache key for a series' year-over-year value; the bare sid holds the raw value."""
+    return f"{sid}:yoy"
+
+
+class IndicatorContext:
+    """Where resolvers read current data from."""
+
+    def __init__(self, fred_cache, fred_ttl_seconds, get_yahoo_quote, composite_payload):
+        self.fred_cache = fred_cache
+        self.fred_ttl_seconds = fred_ttl_seconds
+        self.get_yahoo_quote = get_yahoo_quote
+        self.composite_payload = composite_payload
+
+
+class Indicator:
+    kind = None
+    fred_series = ()
+    yahoo_symbol = None
+    derive_spec = None  # (kind, arg) for SeriesStore.derive, if it has a FRED history
+
+    def __init__(self, name, definition, ctx):
+        self.name = name
+        self.ctx = ctx
+
+    def payload(self, revalidate=True):
+        return {"name": self.name, "value": None}
+
+
+class FredIndicator(Indicator):
+    kind = "fred"
+
+    def __init__(self, name, definition, ctx):
+        super().__init__(name, definition, ctx)
+        self.sid = definition["series"]
+        self.fred_series = (self.sid,)
+        self.derive_spec = (self.kind, self.sid)
+        self.cache_key = self.sid
+
+    def payload(self, revalidate=True):
+        entry = self.ctx.fred_cache.get(self.cache_key, {})
+        CACHE_LOOKUPS.inc("fred_cache", "hit" if entry else "miss")
+        return {
+            "name": self.name,
+            "value": entry.get("value"),
+            **staleness(entry, self.ctx.fred_ttl_seconds),
+        }
+
+
+class FredYoyIndicator(FredIndicator):
+    kind = "fred_yoy"
+
+    def __init__(self, name, definition, ctx):
+        super().__init__(name, definition, ctx)
+        self.cache_key = yoy_key(self.sid)  # see fetch_fred_series
+
+
+class FredSpreadIndicator(Indicator):
+    kind = "fred_spread"
+
+    def __init__(self, name, definition, ctx):
+        super().__init__(name, definition, ctx)
+        self.fred_series = tuple(definition["series"])
+        if len(self.fred_series) != 2:
+            raise ValueError(f"Indicator {name!r}: a spread needs exactly two series")
+        self.derive_spec = (self.kind, self.fred_series)
+
+    def payload(self, revalidate=True):
+        s1, s2 = self.fred_series
+        v1 = self.ctx.fred_cache.get(s1, {}).get("value")
+        v2 = self.ctx.fred_cache.get(s2, {}).get("value")
+        return {"name": self.name, "value": round(v2 - v1, 4) if v1 and v2 else None}
+
+
+class FredAverageIndicator(Indicator):
+    kind = "fred_average"
+
+    def __init__(self, name, definition, ctx):
+        super().__init__(name, definition, ctx)
+        self.fred_series = tuple(definition["series"])
+
+    def payload(self, revalidate=True):
+        values = [self.ctx.fred_cache.get(sid, {}).get("value") for sid in self.fred_series]
+        values = [v for v in values if v is not None]
+        avg = sum(values) / len(values) if values else None
+        return {"name": self.name, "value": round(avg, 2) if avg else None}
+
+
+class YahooIndicator(Indicator):
+    kind = "yahoo"
+
+    def __init__(self, name, definition, ctx):
+        super().__init__(name, definition, ctx)
+        self.yahoo_symbol = definition["symbol"]
+
+    def payload(self, revalidate=True):
+        quote = self.ctx.get_yahoo_quote(self.yahoo_symbol, revalidate)
+        if not quote:
+            return {"name": self.name, "value": None}
+        return {
+            "name": self.name,
+            "value": quote["value"],
+            "timestamp": quote["timestamp"].isoformat(),
+            "stale": quote["stale"],
+        }
+
+
+class ConstantIndicator(Indicator):
+    kind = "constant"
+
+    def __init__(self, name, definition, ctx):
+        super().__init__(name, definition, ctx)
+        self.value = definition.get("value")
+
+    def payload(self, revalidate=True):
+        return {"name": self.name, "value": self.value}
+
+
+class CompositeIndicator(Indicator):
+    kind = "composite"
+
+    def payload(self, revalidate=True):
+        return self.ctx.composite_payload()
+
+
+RESOLVERS = {
+    ("fred", "latest"): FredIndicator,
+    ("fred", "yoy"): FredYoyIndicator,
+    ("fred", "spread"): FredSpreadIndicator,
+    ("fred", "average"): FredAverageIndicator,
+    ("yahoo", "latest"): YahooIndicator,
+    ("constant", "latest"): ConstantIndicator,
+    ("composite", "latest"): CompositeIndicator,
+}
+
+
+def compile_indicators(definitions, ctx):
+    """Build {name: resolver} from config definitions; raises ValueError on a bad entry."""
+    indicators = {}
+    for name, definition in definitions.items():
+        key = (definition.get("source"), definition.get("transform", "latest"))
+        resolver = RESOLVERS.get(key)
+        if resolver is None:
+            raise ValueError(f"Indicator {name!r}: unsupported source/transform {key}")
+        try:
+            indicators[name] = resolver(name, definition, ctx)
+        except KeyError as e:
+            raise ValueError(f"Indicator {name!r}: missing field {e}") from None
+    return indicators
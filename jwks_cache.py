@@ -0,0 +1,66 @@
+# jwks_cache.py
+"""Parsed JWKS signing keys, indexed by key ID.
+
+The key set is downloaded once and refreshed when its TTL runs out or a
+token names a kid we haven't seen (key rotation). Unknown-kid refreshes
+are rate limited so a stream of forged tokens can't hammer the issuer.
+"""
+import asyncio
+import json
+import logging
+from time import monotonic
+
+from jwt.algorithms import RSAAlgorithm
+
+JWKS_TTL_SECONDS = 3600
+MIN_REFRESH_INTERVAL_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    def __init__(self, url, ttl_seconds=JWKS_TTL_SECONDS, min_refresh_interval=MIN_REFRESH_INTERVAL_SECONDS):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self.keys = {}  # kid -> public key
+        self.fetched_at = None
+        self.lock = asyncio.Lock()
+
+    def expired(self):
+        return self.fetched_at is None or monotonic() - self.fetched_at > self.ttl_seconds
+
+    async def refresh(self, client):
+        resp = await client.get(self.url)
+        resp.raise_for_status()
+        keys = {}
+        for jwk in resp.json()["keys"]:
+            try:
+                keys[jwk["kid"]] = RSAAlgorithm.from_jwk(json.dumps(jwk))
+            except Exception as e:
+                logger.warning("Skipping unusable JWK %s: %s", jwk.get("kid"), e)
+        self.keys = keys
+        self.fetched_at = monotonic()
+        logger.info("Loaded %d JWKS keys", len(keys))
+
+    async def get_key(self, kid, client):
+        """Public key for `kid`; raises KeyError if the issuer doesn't publish it."""
+        key = self.keys.get(kid)
+        if key is not None and not self.expired():
+            return key
+        async with self.lock:
+            # Another request may have refreshed while we waited
+            key = self.keys.get(kid)
+            stale = self.expired()
+            recently = self.fetched_at is not None and monotonic() - self.fetched_at < self.min_refresh_interval
+            if stale or (key is None and not recently):
+                try:
+                    await self.refresh(client)
+                except Exception:
+                    if key is None:
+                        raise
+                    logger.warning("JWKS refresh failed; using cached key %s", kid, exc_info=True)
+                key = self.keys.get(kid, key)
+        if key is None:
+            raise KeyError(kid)
+        return key
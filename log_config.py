@@ -0,0 +1,54 @@
+# log_config.py
+"""Logging setup shared by the dashboard processes.
+
+Records go onto an in-memory queue and are written to stderr by a
+QueueListener thread, so a request thread never blocks on log I/O. Level
+gating happens before any formatting: pass arguments lazily
+(`logger.debug("Cached %s: %s", sid, value)`) and a disabled debug call
+costs one level check. The level comes from LOG_LEVEL (default INFO) and
+can be changed at runtime with set_level().
+"""
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener = None
+
+
+def configure_logging(level=None):
+    """Route the root logger through a queue; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+    records = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(records)]
+    set_level(level or os.getenv("LOG_LEVEL", "INFO"))
+
+
+def set_level(level, name=None):
+    """Set the level of the root (or named) logger; returns the new level name.
+
+    Raises ValueError for an unknown level name.
+    """
+    if isinstance(level, str):
+        value = logging.getLevelName(level.upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Unknown log level {level!r}")
+        level = value
+    logging.getLogger(name).setLevel(level)
+    return logging.getLevelName(level)
+
+
+def get_level(name=None):
+    return logging.getLevelName(logging.getLogger(name).getEffectiveLevel())
@@ -0,0 +1,111 @@
+# market_summary.py
+"""Compact, versioned market summary shared by the dashboard and the chatbot.
+
+The dashboard refresher rebuilds it from the dashboard state after each
+refresh and replaces the file atomically; the chatbot keeps the parsed
+copy in memory and only re-reads the file when its mtime changes, so
+adding dashboard context to a chat message costs one stat() at most.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from time import monotonic
+
+MARKET_SUMMARY_PATH = os.getenv("MARKET_SUMMARY_PATH", "market_summary.json")
+SUMMARY_FORMAT = 1
+# How often a reader checks the file for a newer summary.
+CHECK_INTERVAL_SECONDS = 1.0
+CHANGE_DAYS = 7
+
+
+def _fmt(value):
+    return "n/a" if value is None else f"{value:,.2f}"
+
+
+def build_summary(state, changes=None):
+    """Summary dict from dashboard_state(): values, recent changes and the composite score.
+
+    `changes` maps an indicator name to (change, since date) over the last
+    CHANGE_DAYS calendar days, e.g. from HistoryStore.change().
+    """
+    changes = changes or {}
+    lines = []
+    composite = state.get("composite")
+    if composite and composite.get("composite_score") is not None:
+        risk = composite["risk_classification"]
+        details = ", ".join(f"{name.replace('_', ' ')} {_fmt(v)}" for name, v in composite["details"].items())
+        lines.append(f"Composite risk score: {_fmt(composite['composite_score'])}/100, "
+                     f"{risk['label']} ({risk['range']}). Sub-scores: {details}.")
+    indicators = {}
+    for name, payload in state.get("indicators", {}).items():
+        value = payload.get("value")
+        change, since = changes.get(name) or (None, None)
+        if value is None:
+            change, since = None, None
+        elif change is not None:
+            change = round(change, 4)
+        indicators[name] = {"value": value, "change_7d": change, "change_since": since,
+                            "stale": payload.get("stale", False)}
+        line = f"{name}: {_fmt(value)}"
+        if change is not None:
+            line += f" ({change:+,.2f} since {since})"
+        if payload.get("stale"):
+            line += " [stale]"
+        lines.append(line)
+    text = "\n".join(lines)
+    return {
+        "format": SUMMARY_FORMAT,
+        "version": hashlib.sha1(text.encode()).hexdigest()[:16],
+        "generated_at": datetime.utcnow().isoformat(),
+        "composite": composite and {k: composite.get(k) for k in ("composite_score", "details")},
+        "indicators": indicators,
+        "text": text,
+    }
+
+
+def write_summary(summary, path=MARKET_SUMMARY_PATH):
+    """Atomically replace the summary file; readers never see a partial write."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".market_summary.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(summary, f, separators=(",", ":"))
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600; the chatbot may run as another user
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class SummaryReader:
+    def __init__(self, path=MARKET_SUMMARY_PATH, check_interval=CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self.summary = None
+        self.mtime = None
+        self.checked_at = None
+
+    def get(self):
+        """The latest summary, or None if the refresher hasn't written one yet."""
+        now = monotonic()
+        if self.checked_at is not None and now - self.checked_at < self.check_interval:
+            return self.summary
+        self.checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime != self.mtime:
+                with open(self.path) as f:
+                    summary = json.load(f)
+                if summary.get("format") == SUMMARY_FORMAT:
+                    self.summary, self.mtime = summary, mtime
+        except (OSError, ValueError):
+            pass  # keep serving the last good summary
+        return self.summary
+
+    def context(self):
+        summary = self.get()
+        if not summary or not summary["text"]:
+            return None
+        return f"Current dashboard data (as of {summary['generated_at']} UTC):\n{summary['text']}"
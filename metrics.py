@@ -0,0 +1,124 @@
+# metrics.py
+"""Minimal in-process Prometheus-style metrics.
+
+Counters, gauges and histograms keyed by label values, rendered in the
+Prometheus text exposition format by render(). Each update is a dict
+lookup under a per-metric lock, cheap enough for request hot paths.
+Metrics are per process; under a multi-worker server scrape each worker.
+"""
+from bisect import bisect_left
+from threading import Lock
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REGISTRY = []
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = Lock()
+        REGISTRY.append(self)
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, labels, (), value) for labels, value in self.values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, extra, value in self.samples():
+            lines.append(f"{name}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """A gauge set directly, or computed at scrape time by `collect()` -> {labels: value}."""
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def set(self, value, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+    def samples(self):
+        if self.collect is None:
+            return super().samples()
+        return [(self.name, labels, (), value) for labels, value in self.collect().items()]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        out = []
+        with self.lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self.values.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                out.append((f"{self.name}_bucket", labels, (("le", _format_value(bound)),), cumulative))
+            out.append((f"{self.name}_sum", labels, (), total))
+            out.append((f"{self.name}_count", labels, (), count))
+        return out
+
+
+def render():
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+REQUEST_LATENCY = Histogram(
+    "dashboard_request_duration_seconds", "HTTP request latency by route.", ["route", "method", "status"])
+UPSTREAM_LATENCY = Histogram(
+    "dashboard_upstream_request_duration_seconds", "Latency of calls to upstream data sources.", ["source"])
+UPSTREAM_ERRORS = Counter(
+    "dashboard_upstream_errors_total", "Failed calls to upstream data sources.", ["source"])
+CACHE_LOOKUPS = Counter(
+    "dashboard_cache_lookups_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"])
+REFRESH_DURATION = Histogram(
+    "dashboard_refresh_duration_seconds", "Duration of background refresh jobs.", ["job"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
@@ -0,0 +1,68 @@
+# mock_chat_server.py
+"""Minimal OpenAI-compatible chat completions server for development and tests.
+
+    uvicorn mock_chat_server:app --port 8020
+    CHAT_API_BASE=http://127.0.0.1:8020/v1 python chatbot_server.py
+
+Streams a canned answer echoing the last user message one word per chunk,
+MOCK_CHAT_DELAY seconds apart. A message containing "fail" gets a 500.
+`stats` counts requests and how many were streaming at once.
+"""
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DELAY_SECONDS = float(os.getenv("MOCK_CHAT_DELAY", "0.01"))
+
+app = FastAPI()
+stats = {"requests": 0, "active": 0, "max_active": 0, "messages": []}
+
+
+def reset_stats():
+    stats.update(requests=0, active=0, max_active=0, messages=[])
+
+
+def reply_to(messages):
+    prompt = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    return f"Mock answer to: {prompt}"
+
+
+def chunk(model, content=None, finish_reason=None):
+    delta = {"content": content} if content is not None else {}
+    return {"object": "chat.completion.chunk", "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    model = body.get("model", "mock")
+    stats["requests"] += 1
+    stats["messages"].append(messages)
+    reply = reply_to(messages)
+    if "fail" in reply:
+        return JSONResponse({"error": {"message": "mock failure"}}, status_code=500)
+    if not body.get("stream"):
+        return JSONResponse({"object": "chat.completion", "model": model, "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}
+        ]})
+
+    async def events():
+        stats["active"] += 1
+        stats["max_active"] = max(stats["max_active"], stats["active"])
+        try:
+            words = reply.split(" ")
+            for i, word in enumerate(words):
+                await asyncio.sleep(DELAY_SECONDS)
+                text = word if i == 0 else " " + word
+                yield f"data: {json.dumps(chunk(model, text))}\n\n"
+            yield f"data: {json.dumps(chunk(model, finish_reason='stop'))}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            stats["active"] -= 1
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,61 @@
+# refresh_scheduler.py
+"""Priority queue of refresh jobs, each with its own cadence.
+
+Market tickers refresh intraday, daily FRED series (yields, spreads) a few
+times a day, and monthly macro series only once the next observation's
+period has ended and a release is possible, polling until it shows up.
+"""
+import heapq
+from datetime import timedelta
+from itertools import count
+from threading import Lock
+
+import pandas as pd
+
+INTRADAY_INTERVAL = timedelta(minutes=5)
+DAILY_INTERVAL = timedelta(hours=1)
+RELEASE_POLL_INTERVAL = timedelta(hours=6)
+RETRY_INTERVAL = timedelta(minutes=5)
+
+
+class RefreshScheduler:
+    def __init__(self):
+        self.queue = []
+        self.seq = count()
+        self.lock = Lock()
+
+    def schedule(self, key, due):
+        with self.lock:
+            heapq.heappush(self.queue, (due, next(self.seq), key))
+
+    def pop_due(self, now):
+        """Remove and return every job key due at or before `now`."""
+        due = []
+        with self.lock:
+            while self.queue and self.queue[0][0] <= now:
+                due.append(heapq.heappop(self.queue)[2])
+        return due
+
+    def next_due(self):
+        with self.lock:
+            return self.queue[0][0] if self.queue else None
+
+
+def series_frequency(series):
+    """"daily" for daily/weekly series, "monthly" for anything sparser, from recent spacing."""
+    gaps = series.index[-10:].to_series().diff().dropna()
+    if gaps.empty or gaps.median() <= pd.Timedelta(days=7):
+        return "daily"
+    return "monthly"
+
+
+def next_fred_due(series, now):
+    """When a FRED series should next be fetched, given what the store now holds."""
+    if series is None or series.empty:
+        return now + RETRY_INTERVAL
+    if series_frequency(series) == "daily":
+        return now + DAILY_INTERVAL
+    # Monthly observations are dated the first of their month and released
+    # after that month ends: nothing new can appear before last + 2 months.
+    release_window = (series.index[-1] + pd.DateOffset(months=2)).to_pydatetime()
+    return max(release_window, now + RELEASE_POLL_INTERVAL)
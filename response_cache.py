@@ -0,0 +1,91 @@
+# response_cache.py
+import gzip
+import hashlib
+import json
+from threading import Lock
+from time import monotonic
+
+from flask import Response, request
+
+from metrics import CACHE_LOOKUPS
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+GZIP_MIN_BYTES = 1024
+# Rebuild entries at least this often even without a version bump so
+# time-dependent fields (staleness flags) don't freeze.
+MAX_ENTRY_AGE_SECONDS = 30
+# Keys come from URLs (names, ranges, point counts), so bound the number
+# held between version bumps.
+MAX_ENTRIES = 512
+
+
+def dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=str).encode()
+
+
+class CachedBody:
+    def __init__(self, version, body):
+        self.version = version
+        self.built = monotonic()
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+
+
+class ResponseCache:
+    """Pre-encoded JSON responses keyed on a data version the refresher bumps.
+
+    A hot endpoint serializes (and gzips) its payload once per version;
+    every other request is a dict lookup, and clients revalidating with
+    If-None-Match get a 304 with no body.
+    """
+
+    def __init__(self, max_age=MAX_ENTRY_AGE_SECONDS, max_entries=MAX_ENTRIES):
+        self.version = 0
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.entries = {}
+        self.lock = Lock()
+
+    def bump(self):
+        with self.lock:
+            self.version += 1
+            self.entries.clear()
+
+    def get(self, key, build):
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == self.version and monotonic() - entry.built <= self.max_age:
+            CACHE_LOOKUPS.inc("response_cache", "hit")
+        else:
+            CACHE_LOOKUPS.inc("response_cache", "miss")
+            version = self.version
+            entry = CachedBody(version, dumps(build()))
+            with self.lock:
+                if version == self.version:
+                    self.entries.pop(key, None)
+                    if len(self.entries) >= self.max_entries:
+                        del self.entries[next(iter(self.entries))]  # oldest build first
+                    self.entries[key] = entry
+        return entry
+
+    def respond(self, key, build):
+        """Serve `build()` as JSON from the cache, honouring If-None-Match and gzip."""
+        entry = self.get(key, build)
+        use_gzip = entry.gzipped is not None and request.accept_encodings["gzip"] > 0
+        etag = entry.etag + ("-gz" if use_gzip else "")
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(entry.gzipped if use_gzip else entry.body, mimetype="application/json")
+            if use_gzip:
+                response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
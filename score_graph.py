@@ -0,0 +1,78 @@
+# score_graph.py
+from threading import Lock
+
+from indicators import yoy_key
+
+# Composite sub-score -> score inputs it reads.
+SUB_SCORE_INPUTS = {
+    "rates_and_curve": ["two_year_yield", "ten_year_yield", "thirty_year_yield",
+                        "ust_2s10s_curve", "ust_3m10y_curve"],
+    "credit_and_volatility": ["vix", "move_index", "vx_tlt", "hy_credit_spread"],
+    "macro_indicators": ["fed_funds_rate", "cpi_yoy", "unemployment_rate", "retail_sales"],
+    "flight_to_safety": ["gold_price", "bitcoin_price", "sofr_spread"],
+}
+
+# Score input -> cache entries it is computed from, as (cache, key).
+INPUT_SOURCES = {
+    "two_year_yield": [("fred", "DGS2")],
+    "ten_year_yield": [("fred", "DGS10")],
+    "thirty_year_yield": [("fred", "DGS30")],
+    "ust_2s10s_curve": [("fred", "DGS10"), ("fred", "DGS2")],
+    "ust_3m10y_curve": [("fred", "DGS10"), ("fred", "TB3MS")],
+    "fed_funds_rate": [("fred", "FEDFUNDS")],
+    "unemployment_rate": [("fred", "UNRATE")],
+    "cpi_yoy": [("fred", yoy_key("CPIAUCSL"))],
+    "retail_sales": [("fred", "RSAFS")],
+    "vix": [("history", "VIX")],
+    "move_index": [("history", "MOVE Index")],
+    "vx_tlt": [("history", "VXTLT")],
+    "sofr_spread": [("fred", "SOFR"), ("fred", "EFFR")],
+    "hy_credit_spread": [("fred", "BAMLH0A0HYM2EY")],
+    "gold_price": [("history", "Gold")],
+    "bitcoin_price": [("history", "Bitcoin")],
+}
+
+
+class ScoreGraph:
+    """Recompute only the composite sub-scores whose inputs changed.
+
+    Refreshers report which cache entries changed via mark(); recompute()
+    then evaluates just the dirty sub-scores against one consistent view of
+    the inputs and returns the full result for a single atomic cache update.
+    """
+
+    def __init__(self, normalizers, weights,
+                 sub_score_inputs=SUB_SCORE_INPUTS, input_sources=INPUT_SOURCES):
+        self.normalizers = normalizers
+        self.weights = weights
+        self.dependents = {}
+        for sub_score, inputs in sub_score_inputs.items():
+            for name in inputs:
+                for source in input_sources[name]:
+                    self.dependents.setdefault(source, set()).add(sub_score)
+        self.values = {}
+        self.dirty = set(normalizers)
+        self.lock = Lock()
+
+    def mark(self, sources):
+        with self.lock:
+            for source in sources:
+                self.dirty |= self.dependents.get(source, set())
+
+    def recompute(self, gather_inputs):
+        """Return {sub_score: value, ..., "value": composite} if anything was dirty, else None.
+
+        Dirty flags are only cleared once every sub-score computed, so a
+        failure (missing inputs) is retried on the next call.
+        """
+        with self.lock:
+            if not self.dirty:
+                return None
+            data = gather_inputs()
+            values = dict(self.values)
+            for sub_score in self.dirty:
+                values[sub_score] = self.normalizers[sub_score](data)
+            composite = sum(self.weights[name] * values[name] for name in self.weights)
+            self.values = values
+            self.dirty = set()
+        return {**values, "value": round(composite, 2)}
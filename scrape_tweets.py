@@ -1,24 +1,203 @@
-from playwright.sync_api import sync_playwright
+# scrape_tweets.py
+"""Scrape recent tweets from profile pages with a pooled headless browser.
 
-def get_recent_tweets(username, count=10):
-    tweets = []
+One Chromium process is launched on first use and kept alive; a fixed set
+of browser contexts is reused across scrapes, so each scrape costs a page
+load rather than a browser start. Several profiles are scraped
+concurrently, and results are cached per user and deduplicated by tweet ID.
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(f"https://twitter.com/{username}")
+Point `base_url` (or SCRAPE_BASE_URL) at a local server to scrape the HTML
+fixtures in tests/fixtures/profiles instead of the live site, e.g.
 
-        # Wait for tweets to load
-        page.wait_for_selector('article')
+    python -m http.server 8081 --directory tests/fixtures/profiles &
+    python scrape_tweets.py alice bob --base-url http://127.0.0.1:8081
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+from threading import Lock, Thread
+from time import monotonic
 
-        articles = page.query_selector_all("article")[:count]
-        for article in articles:
+from playwright.async_api import async_playwright
+
+BASE_URL = os.getenv("SCRAPE_BASE_URL", "https://twitter.com")
+POOL_SIZE = 4
+CACHE_SECONDS = 300
+MAX_CACHED_TWEETS = 50
+# Contexts accumulate cookies and storage; replace one after this many pages.
+CONTEXT_MAX_USES = 100
+PAGE_TIMEOUT_MS = 20000
+
+STATUS_LINK = re.compile(r"/status/(\d+)")
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    def __init__(self, size=POOL_SIZE, base_url=BASE_URL, cache_seconds=CACHE_SECONDS):
+        self.size = size
+        self.base_url = base_url.rstrip("/")
+        self.cache_seconds = cache_seconds
+        self.playwright = None
+        self.browser = None
+        self.contexts = None
+        self.cache = {}  # username -> (scraped_at, tweets newest first)
+        self.inflight = {}  # username -> Task, so concurrent callers share one scrape
+        self.start_lock = asyncio.Lock()
+
+    async def start(self):
+        async with self.start_lock:
+            if self.browser is not None and self.browser.is_connected():
+                return
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True)
+            if self.contexts is None:
+                self.contexts = asyncio.Queue()
+                for _ in range(self.size):
+                    self.contexts.put_nowait([await self.browser.new_context(), 0])
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def scrape(self, username, count=10):
+        """Up to `count` tweets for `username` as {"id", "text", "user"} dicts, newest first."""
+        cached = self.cache.get(username)
+        if cached and monotonic() - cached[0] < self.cache_seconds:
+            return cached[1][:count]
+        task = self.inflight.get(username)
+        if task is None:
+            task = self.inflight[username] = asyncio.ensure_future(self._scrape(username))
+            task.add_done_callback(lambda _: self.inflight.pop(username, None))
+        return (await task)[:count]
+
+    async def scrape_many(self, usernames, count=10):
+        """Scrape several profiles concurrently; returns {username: tweets}, skipping failures."""
+        results = await asyncio.gather(*(self.scrape(u, count) for u in usernames), return_exceptions=True)
+        tweets = {}
+        for username, result in zip(usernames, results):
+            if isinstance(result, Exception):
+                logger.warning("Scrape failed for %s: %s", username, result)
+            else:
+                tweets[username] = result
+        return tweets
+
+    async def _scrape(self, username):
+        await self.start()
+        slot = await self.contexts.get()
+        context = slot[0]
+        try:
+            page = await context.new_page()
             try:
-                content = article.inner_text()
-                tweets.append(content)
-            except Exception as e:
-                print("Tweet parse error:", e)
+                await page.goto(f"{self.base_url}/{username}", timeout=PAGE_TIMEOUT_MS)
+                await page.wait_for_selector("article", timeout=PAGE_TIMEOUT_MS)
+                scraped = []
+                for article in await page.query_selector_all("article"):
+                    try:
+                        scraped.append(await self._parse_article(article, username))
+                    except Exception as e:
+                        logger.warning("Tweet parse error: %s", e)
+            finally:
+                await page.close()
+        except Exception:
+            slot[0], slot[1] = await self._replace_context(context), 0
+            raise
+        finally:
+            slot[1] += 1
+            if slot[1] >= CONTEXT_MAX_USES:
+                slot[0], slot[1] = await self._replace_context(slot[0]), 0
+            self.contexts.put_nowait(slot)
+        tweets = merge_tweets(scraped, self.cache.get(username, (0, []))[1])
+        self.cache[username] = (monotonic(), tweets)
+        return tweets
+
+    async def _parse_article(self, article, username):
+        text = await article.inner_text()
+        tweet_id = None
+        link = await article.query_selector('a[href*="/status/"]')
+        if link is not None:
+            match = STATUS_LINK.search(await link.get_attribute("href") or "")
+            tweet_id = match.group(1) if match else None
+        return {"id": tweet_id, "text": text, "user": username}
+
+    async def _replace_context(self, context):
+        try:
+            await context.close()
+        except Exception:
+            pass
+        await self.start()  # relaunches the browser if it crashed
+        return await self.browser.new_context()
+
+
+def merge_tweets(new, old, limit=MAX_CACHED_TWEETS):
+    """Newest-first union of two tweet lists, deduplicated by ID (or text when there is none)."""
+    merged = {}
+    for tweet in new + old:
+        merged.setdefault(tweet["id"] or tweet["text"], tweet)
+    with_id = sorted((t for t in merged.values() if t["id"]), key=lambda t: int(t["id"]), reverse=True)
+    without_id = [t for t in merged.values() if not t["id"]]
+    return (with_id + without_id)[:limit]
+
+
+# Synchronous access for non-async callers: the pool lives on one
+# background event loop shared by every thread in the process.
+_loop = None
+_pool = None
+_loop_lock = Lock()
+
+
+def get_pool():
+    global _loop, _pool
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            Thread(target=_loop.run_forever, name="scrape-tweets", daemon=True).start()
+            _pool = BrowserPool()
+    return _pool
+
+
+def _run(coro, timeout):
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result(timeout)
+
+
+def get_recent_tweets(username, count=10, timeout=60):
+    """Text of up to `count` recent tweets for `username`."""
+    pool = get_pool()
+    return [tweet["text"] for tweet in _run(pool.scrape(username, count), timeout)]
+
+
+def get_recent_tweets_many(usernames, count=10, timeout=60):
+    """{username: [tweet dicts]} for several users, scraped concurrently."""
+    pool = get_pool()
+    return _run(pool.scrape_many(list(usernames), count), timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape recent tweets for one or more users.")
+    parser.add_argument("usernames", nargs="+")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--base-url", default=BASE_URL, help="site to scrape, e.g. a local fixture server")
+    args = parser.parse_args()
+
+    async def run():
+        pool = BrowserPool(base_url=args.base_url)
+        try:
+            return await pool.scrape_many(args.usernames, args.count)
+        finally:
+            await pool.close()
+
+    for username, tweets in asyncio.run(run()).items():
+        print(f"@{username}: {len(tweets)} tweets")
+        for tweet in tweets:
+            print(f"  [{tweet['id'] or '-'}] {tweet['text'][:100]!r}")
 
-        browser.close()
 
-    return tweets
+if __name__ == "__main__":
+    main()
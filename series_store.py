@@ -0,0 +1,98 @@
+# series_store.py
+from datetime import timedelta
+from threading import Lock
+
+import pandas as pd
+
+# Re-request a short window before the last stored observation on each
+# refresh so late revisions (monthly macro prints, holiday fills) are picked up.
+REVISION_OVERLAP_DAYS = 31
+
+
+class SeriesStore:
+    """In-memory store of full observation histories keyed by series id.
+
+    Refreshes only download observations newer than what is already held
+    (minus a small revision overlap) and merge them into the stored series.
+    """
+
+    def __init__(self, overlap_days=REVISION_OVERLAP_DAYS):
+        self.overlap = timedelta(days=overlap_days)
+        self.series = {}
+        self.derived = {}
+        self.lock = Lock()
+
+    def get(self, key):
+        return self.series.get(key)
+
+    def last_date(self, key):
+        series = self.series.get(key)
+        if series is None or series.empty:
+            return None
+        return series.index[-1]
+
+    def merge(self, key, new):
+        """Merge freshly fetched observations; returns True if anything changed."""
+        new = new.dropna()
+        with self.lock:
+            old = self.series.get(key)
+            if old is None:
+                merged = new.sort_index()
+            else:
+                merged = new.combine_first(old).sort_index()
+            changed = old is None or not merged.equals(old)
+            self.series[key] = merged
+        return changed
+
+    def refresh_fred(self, fetcher, series_ids):
+        """Fetch new observations for FRED series.
+
+        Returns (fetched, changed): the ids whose fetch succeeded, and the
+        subset whose stored series changed.
+        """
+        starts = {}
+        for sid in series_ids:
+            last = self.last_date(sid)
+            starts[sid] = (last - self.overlap).strftime("%Y-%m-%d") if last is not None else None
+        fetched, changed = set(), set()
+        for sid, series in fetcher.fetch_many(series_ids, observation_starts=starts).items():
+            fetched.add(sid)
+            if self.merge(sid, pd.Series(series, dtype=float)):
+                changed.add(sid)
+        return fetched, changed
+
+    def derive(self, indicators):
+        """Recompute derived indicator series from the stored raw series.
+
+        `indicators` maps an indicator name to ("fred", sid), ("fred_yoy", sid)
+        or ("fred_spread", (sid1, sid2)); spreads are sid2 - sid1, matching
+        the indicator API. Results are kept in `derived` by indicator name.
+        """
+        derived = {}
+        for name, (kind, arg) in indicators.items():
+            if kind == "fred_spread":
+                legs = [self.series.get(sid) for sid in arg]
+                if any(leg is None for leg in legs):
+                    continue
+                series = spread(*legs)
+            else:
+                series = self.series.get(arg)
+                if series is None:
+                    continue
+                if kind == "fred_yoy":
+                    series = yoy(series)
+            derived[name] = series
+        with self.lock:
+            self.derived.update(derived)
+        return derived
+
+
+def spread(first, second):
+    """second - first on a shared date index; the lower-frequency leg is forward-filled."""
+    frame = pd.concat([first, second], axis=1).sort_index().ffill().dropna()
+    return frame.iloc[:, 1] - frame.iloc[:, 0]
+
+
+def yoy(series, periods=12):
+    """Year-over-year percent change for a monthly series."""
+    return (series.pct_change(periods, fill_method=None) * 100).dropna()
@@ -0,0 +1,86 @@
+# session_store.py
+"""Chat sessions in Redis, fronted by a small in-process LRU.
+
+Redis stays the source of truth (sessions are shared across workers and
+expire there), but a validated session is remembered locally for up to
+LOCAL_TTL_SECONDS, so a busy /chat connection usually never leaves the
+process. A session deleted in Redis stops working locally within that
+window.
+"""
+import json
+from collections import OrderedDict
+from time import monotonic
+
+import redis.asyncio as aioredis
+
+SESSION_TTL_SECONDS = 3600
+LOCAL_TTL_SECONDS = 60
+LOCAL_MAX_ENTRIES = 1024
+REDIS_MAX_CONNECTIONS = 50
+
+
+def create_redis(url, max_connections=REDIS_MAX_CONNECTIONS):
+    """An asyncio Redis client backed by one shared connection pool."""
+    pool = aioredis.ConnectionPool.from_url(url, max_connections=max_connections)
+    return aioredis.Redis(connection_pool=pool)
+
+
+class TTLCache:
+    """LRU of at most `max_entries` values, each valid until its own expiry."""
+
+    def __init__(self, max_entries=LOCAL_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if monotonic() >= entry[0]:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value, ttl_seconds):
+        self.entries[key] = (monotonic() + ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def pop(self, key):
+        self.entries.pop(key, None)
+
+
+class SessionStore:
+    def __init__(self, redis_client, ttl_seconds=SESSION_TTL_SECONDS,
+                 local_ttl_seconds=LOCAL_TTL_SECONDS, local_max_entries=LOCAL_MAX_ENTRIES):
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.local_ttl_seconds = local_ttl_seconds
+        self.local = TTLCache(local_max_entries)
+
+    async def create(self, session_id, data):
+        await self.redis.set(session_id, json.dumps(data), ex=self.ttl_seconds)
+        self.local.put(session_id, data, self.local_ttl_seconds)
+
+    async def get(self, session_id):
+        """Session data, or None if the session doesn't exist or has expired."""
+        data = self.local.get(session_id)
+        if data is not None:
+            return data
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(session_id)
+            pipe.pttl(session_id)
+            raw, pttl = await pipe.execute()
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        # Never trust the local copy past the session's own expiry in Redis
+        ttl = self.local_ttl_seconds if pttl < 0 else min(self.local_ttl_seconds, pttl / 1000)
+        self.local.put(session_id, data, ttl)
+        return data
+
+    async def delete(self, session_id):
+        self.local.pop(session_id)
+        await self.redis.delete(session_id)
@@ -0,0 +1,121 @@
+# snapshot_store.py
+import fcntl
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+SNAPSHOT_DB_PATH = os.getenv("SNAPSHOT_DB_PATH", "snapshot.db")
+REFRESHER_LOCK_PATH = os.getenv("REFRESHER_LOCK_PATH", SNAPSHOT_DB_PATH + ".lock")
+
+
+def _encode(obj):
+    if isinstance(obj, datetime):
+        return {"__dt__": obj.isoformat()}
+    if hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def _decode(obj):
+    if "__dt__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__dt__"])
+    return obj
+
+
+class SnapshotStore:
+    """Durable SQLite snapshot of the dashboard caches and raw series.
+
+    Caches are stored as JSON blobs keyed by name, raw series as
+    date/value arrays, so a restart can serve the last known data at once
+    and resume incremental FRED downloads instead of refetching history.
+    """
+
+    def __init__(self, path=SNAPSHOT_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS caches ("
+                "name TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS series ("
+                "key TEXT PRIMARY KEY, dates TEXT NOT NULL, vals TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save_cache(self, name, data):
+        payload = json.dumps(data, default=_encode)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO caches (name, data, updated_at) VALUES (?, ?, ?)",
+                (name, payload, datetime.utcnow().isoformat()),
+            )
+
+    def load_caches(self):
+        """Return {name: (data, updated_at)} for every stored cache."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, data, updated_at FROM caches").fetchall()
+        return {
+            name: (json.loads(data, object_hook=_decode), datetime.fromisoformat(updated_at))
+            for name, data, updated_at in rows
+        }
+
+    def save_series(self, series_by_key):
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (key, json.dumps([d.strftime("%Y-%m-%d") for d in series.index]),
+             json.dumps([float(v) for v in series.values]), now)
+            for key, series in series_by_key.items()
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO series (key, dates, vals, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def versions(self):
+        """Latest write time of the caches and series tables, for cheap change polling."""
+        with self._connect() as conn:
+            caches = conn.execute("SELECT MAX(updated_at) FROM caches").fetchone()[0]
+            series = conn.execute("SELECT MAX(updated_at) FROM series").fetchone()[0]
+        return caches, series
+
+    def load_series(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT key, dates, vals FROM series").fetchall()
+        return {
+            key: pd.Series(json.loads(vals), index=pd.DatetimeIndex(json.loads(dates)), dtype=float)
+            for key, dates, vals in rows
+        }
+
+
+class RefresherLock:
+    """Non-blocking exclusive file lock used to elect one refresher process.
+
+    The OS drops the lock when the holder exits, so a surviving worker can
+    take over on its next try_acquire().
+    """
+
+    def __init__(self, path=REFRESHER_LOCK_PATH):
+        self.path = path
+        self.fd = None
+
+    def try_acquire(self):
+        if self.fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        return True
@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Importing app must not touch the real snapshot, lock or summary files.
+_state = tempfile.mkdtemp(prefix="dashboard-tests-")
+os.environ.setdefault("FRED_API_KEY", "0" * 32)
+os.environ["SNAPSHOT_DB_PATH"] = os.path.join(_state, "snapshot.db")
+os.environ["REFRESHER_LOCK_PATH"] = os.path.join(_state, "snapshot.db.lock")
+os.environ["MARKET_SUMMARY_PATH"] = os.path.join(_state, "market_summary.json")
+os.chdir(ROOT)  # app.py reads config.json relative to the working directory
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+import backtest
+
+INPUTS = ["two_year_yield", "ten_year_yield", "thirty_year_yield", "fed_funds_rate", "unemployment_rate",
+          "retail_sales", "hy_credit_spread", "vix", "move_index", "vx_tlt", "gold_price", "bitcoin_price",
+          "cpi_yoy", "ust_2s10s_curve", "ust_3m10y_curve", "sofr_spread"]
+SCALES = {"retail_sales": 800000, "gold_price": 3000, "bitcoin_price": 120000, "move_index": 200, "vix": 60}
+
+
+@pytest.fixture
+def inputs():
+    rng = np.random.default_rng(0)
+    data = {name: rng.uniform(-1, 1, 200) * SCALES.get(name, 8) for name in INPUTS}
+    return pd.DataFrame(data, index=pd.bdate_range("2024-01-01", periods=200))
+
+
+def test_score_frame_matches_live_score(inputs):
+    scores = backtest.score_frame(inputs)
+    for date, row in inputs.iterrows():
+        data = row.to_dict()
+        assert scores.loc[date, "composite"] == pytest.approx(app.calculate_composite_score(data), abs=0.006)
+        for name, normalize in app.score_graph.normalizers.items():
+            assert scores.loc[date, name] == pytest.approx(normalize(data))
+
+
+def test_missing_inputs_score_as_zero():
+    frame = pd.DataFrame({name: [0.0] for name in INPUTS}, index=pd.bdate_range("2024-01-01", periods=1))
+    assert backtest.score_frame(frame)["composite"].iloc[0] == app.calculate_composite_score({})
+
+
+# Worked by hand from the sub-score formulas; the second case hits both clip bounds.
+HAND_CASES = [
+    (
+        {"two_year_yield": 4.5, "ten_year_yield": 4.2, "thirty_year_yield": 4.4, "ust_2s10s_curve": 0.3,
+         "vix": 20, "move_index": 120, "hy_credit_spread": 3.5, "vx_tlt": 18,
+         "unemployment_rate": 4.0, "cpi_yoy": 3.0, "retail_sales": 720000, "fed_funds_rate": 5.33,
+         "gold_price": 1920, "bitcoin_price": 40000},
+        # (60 + 61.5) / 2, (30 + 40 + 52.5 + 18) / 4, (50 + 30 + 10 + 5.33) / 4, (80 + 50) / 2
+        {"rates_and_curve": 60.75, "credit_and_volatility": 35.125, "macro_indicators": 23.8325,
+         "flight_to_safety": 65.0, "composite": 42.12},
+    ),
+    (
+        {"two_year_yield": 2.0, "ten_year_yield": 2.0, "thirty_year_yield": 2.0, "ust_2s10s_curve": -1.0,
+         "vix": 40, "move_index": 80, "hy_credit_spread": 10, "vx_tlt": 40,
+         "unemployment_rate": 2.5, "cpi_yoy": 6.0, "retail_sales": 900000, "fed_funds_rate": 0.1,
+         "gold_price": 1500, "bitcoin_price": 100000},
+        # (100 + 0) / 2, (100 + 0 + 100 + 40) / 4, (100 + 0 + 0 + 0.1) / 4, (0 + 0) / 2
+        {"rates_and_curve": 50.0, "credit_and_volatility": 60.0, "macro_indicators": 25.025,
+         "flight_to_safety": 0.0, "composite": 37.76},
+    ),
+]
+
+
+@pytest.mark.parametrize("data, expected", HAND_CASES)
+def test_hand_computed_scores(data, expected):
+    data = {**{name: 0.0 for name in INPUTS}, **data}
+    frame = pd.DataFrame({name: [value] for name, value in data.items()}, index=pd.bdate_range("2024-01-01", periods=1))
+    scores = backtest.score_frame(frame).iloc[0]
+    for name, value in expected.items():
+        assert scores[name] == pytest.approx(value)
+    for name, normalize in app.score_graph.normalizers.items():
+        assert normalize(data) == pytest.approx(expected[name])
+    assert app.calculate_composite_score(data) == pytest.approx(expected["composite"], abs=0.006)
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+import mock_chat_server
+from chat_backend import ChatBackend
+
+
+@pytest.fixture(autouse=True)
+def mock_server(monkeypatch):
+    mock_chat_server.reset_stats()
+    monkeypatch.setattr(mock_chat_server, "DELAY_SECONDS", 0.02)
+    return mock_chat_server.stats
+
+
+def run(scenario, **backend_options):
+    """Run `scenario(backend)` against the mock model server, in-process over ASGI."""
+    async def main():
+        transport = httpx.ASGITransport(app=mock_chat_server.app)
+        async with httpx.AsyncClient(transport=transport) as client:
+            backend = ChatBackend(client, base_url="http://mock/v1", api_key="test", **backend_options)
+            return await scenario(backend)
+
+    return asyncio.run(main())
+
+
+def test_stream_yields_chunks_with_context(mock_server):
+    async def scenario(backend):
+        return [chunk async for chunk in backend.stream("s1", "what is the VIX?", "VIX: 17.0")]
+
+    chunks = run(scenario)
+    assert len(chunks) > 1
+    assert "".join(chunks) == "Mock answer to: what is the VIX?"
+    messages = mock_server["messages"][0]
+    assert {"role": "system", "content": "VIX: 17.0"} in messages
+    assert messages[-1] == {"role": "user", "content": "what is the VIX?"}
+
+
+def test_identical_prompts_share_one_upstream_request(mock_server):
+    async def scenario(backend):
+        return await asyncio.gather(*(backend.answer(f"s{i}", "  What is the VIX? ") for i in range(6)),
+                                    backend.answer("s9", "what is the vix?"))
+
+    answers = run(scenario)
+    assert mock_server["requests"] == 1
+    assert len(set(answers)) == 1
+
+
+def test_late_follower_replays_streamed_chunks(mock_server):
+    async def scenario(backend):
+        first = asyncio.ensure_future(backend.answer("s1", "one two three four five six"))
+        await asyncio.sleep(0.05)  # part of the answer has streamed by now
+        still_streaming = not first.done()
+        late = asyncio.ensure_future(backend.answer("s2", "one two three four five six"))
+        return still_streaming, await asyncio.gather(first, late)
+
+    still_streaming, (first, late) = run(scenario, cache_ttl_seconds=0)
+    assert still_streaming
+    assert first == late == "Mock answer to: one two three four five six"
+    assert mock_server["requests"] == 1
+
+
+def test_sessions_are_limited_to_max_in_flight(mock_server):
+    async def scenario(backend):
+        await asyncio.gather(*(backend.answer("s1", f"question {i}") for i in range(5)))
+        return dict(backend.session_slots)
+
+    slots = run(scenario, max_per_session=2)
+    assert mock_server["requests"] == 5
+    assert mock_server["max_active"] == 2
+    assert slots == {}  # released once the session has nothing in flight
+
+
+def test_other_sessions_are_not_held_back(mock_server):
+    async def scenario(backend):
+        await asyncio.gather(*(backend.answer(f"s{i}", f"question {i}") for i in range(4)))
+
+    run(scenario, max_per_session=1)
+    assert mock_server["max_active"] == 4
+
+
+def test_completed_answers_are_cached(mock_server):
+    async def scenario(backend):
+        first = await backend.answer("s1", "what is the VIX?", "ctx")
+        again = await backend.answer("s2", "What is the VIX?", "ctx")
+        other_context = await backend.answer("s2", "what is the VIX?", "new ctx")
+        return first, again, other_context
+
+    first, again, other_context = run(scenario)
+    assert first == again == other_context
+    assert mock_server["requests"] == 2  # a different context is a different question
+
+
+def test_upstream_errors_reach_every_follower_and_are_not_cached(mock_server):
+    async def scenario(backend):
+        results = await asyncio.gather(*(backend.answer(f"s{i}", "please fail") for i in range(3)),
+                                       return_exceptions=True)
+        retry = await asyncio.gather(backend.answer("s1", "please fail"), return_exceptions=True)
+        return results, retry
+
+    results, retry = run(scenario)
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results + retry)
+    assert mock_server["requests"] == 2
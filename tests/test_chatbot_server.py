@@ -0,0 +1,52 @@
+import fakeredis
+import httpx
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import chatbot_server
+import mock_chat_server
+from chat_backend import ChatBackend
+from session_store import SessionStore
+
+ORIGIN = "https://iamcalledned.ai"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = SessionStore(fakeredis.FakeAsyncRedis())
+    store.local.put("s1", {"username": "ned", "session_id": "s1"}, 60)
+    monkeypatch.setattr(chatbot_server, "sessions", store)
+    monkeypatch.setattr(chatbot_server, "ALLOWED_ORIGINS", {ORIGIN})
+    monkeypatch.setattr(mock_chat_server, "DELAY_SECONDS", 0)
+    upstream = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_chat_server.app))
+    monkeypatch.setattr(chatbot_server, "chat_backend", ChatBackend(upstream, base_url="http://mock/v1"))
+    test_client = TestClient(chatbot_server.app)
+    test_client.cookies.set("session_id", "s1")
+    return test_client
+
+
+def test_ws_streams_tokens_then_done(client):
+    with client.websocket_connect("/ws", headers={"origin": ORIGIN}) as ws:
+        ws.send_json({"message": "hello there"})
+        frames = []
+        while not frames or frames[-1]["type"] == "token":
+            frames.append(ws.receive_json())
+    assert frames[-1] == {"type": "done"}
+    assert "".join(f["data"] for f in frames[:-1]) == "Mock answer to: hello there"
+
+
+@pytest.mark.parametrize("headers", [{"origin": "https://evil.example"}, {}])
+def test_ws_rejects_other_origins(client, headers):
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with client.websocket_connect("/ws", headers=headers):
+            pass
+    assert excinfo.value.code == 1008
+
+
+def test_ws_rejects_unknown_session(client):
+    client.cookies.set("session_id", "nope")
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with client.websocket_connect("/ws", headers={"origin": ORIGIN}):
+            pass
+    assert excinfo.value.code == 1008
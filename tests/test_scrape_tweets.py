@@ -0,0 +1,132 @@
+import asyncio
+import os
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import sleep
+
+import pytest
+
+import scrape_tweets
+from scrape_tweets import BrowserPool, merge_tweets
+
+PROFILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "profiles")
+PAGE_DELAY_SECONDS = 0.3
+
+
+class ProfileHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture profiles slowly enough that overlapping scrapes are measurable."""
+
+    requests = []
+    active = 0
+    max_active = 0
+    lock = Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(self.path)
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if self.path.endswith("/"):
+                sleep(PAGE_DELAY_SECONDS)
+            super().do_GET()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def profile_server():
+    ProfileHandler.requests = []
+    ProfileHandler.max_active = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(ProfileHandler, directory=PROFILES))
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def profile_loads(username):
+    return ProfileHandler.requests.count(f"/{username}/")
+
+
+def run_with_pool(base_url, scenario, monkeypatch):
+    """Run `scenario(pool)` on a fresh pool, skipping if no Chromium can be launched here."""
+    monkeypatch.setattr(scrape_tweets, "PAGE_TIMEOUT_MS", 3000)
+
+    async def run():
+        pool = BrowserPool(size=4, base_url=base_url)
+        try:
+            try:
+                await pool.start()
+            except Exception as e:
+                pytest.skip(f"Chromium unavailable: {e}".splitlines()[0])
+            return await scenario(pool)
+        finally:
+            await pool.close()
+
+    return asyncio.run(run())
+
+
+def test_merge_tweets_dedupes_by_id():
+    new = [{"id": "30", "text": "c", "user": "u"}, {"id": "20", "text": "b (edited)", "user": "u"}]
+    old = [{"id": "20", "text": "b", "user": "u"}, {"id": "10", "text": "a", "user": "u"},
+           {"id": None, "text": "pinned", "user": "u"}, {"id": None, "text": "pinned", "user": "u"}]
+    merged = merge_tweets(new, old)
+    assert [t["id"] for t in merged] == ["30", "20", "10", None]
+    assert merged[1]["text"] == "b (edited)"  # the fresher copy wins
+    assert len(merge_tweets(new, old, limit=2)) == 2
+
+
+def test_scrape_parses_and_dedupes_fixture_page(profile_server, monkeypatch):
+    async def scenario(pool):
+        return await pool.scrape("alice"), await pool.scrape("bob")
+
+    alice, bob = run_with_pool(profile_server, scenario, monkeypatch)
+    assert [t["id"] for t in alice] == ["1700000000000000105", "1700000000000000104", "1700000000000000101"]
+    assert "Rates are going up again." in alice[0]["text"]
+    assert [t["id"] for t in bob] == ["1700000000000000210", "1700000000000000205", None]
+
+
+def test_pool_reuses_one_browser(profile_server, monkeypatch):
+    async def scenario(pool):
+        browser = pool.browser
+        for username in ["alice", "bob", "carol", "dave"]:
+            pool.cache.clear()
+            await pool.scrape(username)
+        await pool.scrape_many(["alice", "bob"])
+        return browser, pool.browser, pool.contexts.qsize()
+
+    first, last, idle_contexts = run_with_pool(profile_server, scenario, monkeypatch)
+    assert last is first
+    assert idle_contexts == 4
+
+
+def test_scrape_many_runs_concurrently(profile_server, monkeypatch):
+    users = ["alice", "bob", "carol", "dave"]
+
+    async def scenario(pool):
+        return await pool.scrape_many(users), await pool.scrape_many(["alice", "nobody"])
+
+    results, partial_results = run_with_pool(profile_server, scenario, monkeypatch)
+    assert sorted(results) == users
+    assert all(results[u] for u in users)
+    assert ProfileHandler.max_active > 1  # profile pages were loading at the same time
+    assert list(partial_results) == ["alice"]  # the missing profile is skipped, not raised
+
+
+def test_concurrent_callers_share_one_scrape(profile_server, monkeypatch):
+    async def scenario(pool):
+        results = await asyncio.gather(*(pool.scrape("carol") for _ in range(5)))
+        cached = await pool.scrape("carol", count=1)
+        return results, cached
+
+    results, cached = run_with_pool(profile_server, scenario, monkeypatch)
+    assert profile_loads("carol") == 1
+    assert all(r == results[0] for r in results)
+    assert cached == results[0][:1]
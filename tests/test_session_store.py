@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+
+import session_store
+from session_store import SessionStore, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis()
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = TTLCache(max_entries=2)
+    cache.put("a", 1, 60)
+    cache.put("b", 2, 60)
+    assert cache.get("a") == 1  # a is now the most recently used
+    cache.put("c", 3, 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache()
+    cache.put("a", 1, 10)
+    clock[0] += 9.9
+    assert cache.get("a") == 1
+    clock[0] += 0.2
+    assert cache.get("a") is None
+    assert "a" not in cache.entries
+
+
+def test_get_is_served_locally_after_create(clock, redis_client):
+    async def run():
+        store = SessionStore(redis_client)
+        await store.create("s1", {"user": "ned"})
+        await redis_client.delete("s1")  # only the local copy is left
+        return await store.get("s1")
+
+    assert asyncio.run(run()) == {"user": "ned"}
+
+
+def test_get_falls_back_to_redis_and_caps_local_ttl(clock, redis_client):
+    async def run():
+        await redis_client.set("s1", json.dumps({"user": "ned"}), px=1500)
+        store = SessionStore(redis_client, local_ttl_seconds=60)
+        data = await store.get("s1")
+        expires_at = store.local.entries["s1"][0]
+        await redis_client.delete("s1")
+        clock[0] += 1.0
+        still_local = await store.get("s1")
+        clock[0] += 1.0
+        return data, expires_at, still_local, await store.get("s1")
+
+    data, expires_at, still_local, after_expiry = asyncio.run(run())
+    assert data == {"user": "ned"}
+    assert expires_at - 1000.0 <= 1.5  # no longer than the session has left in Redis
+    assert still_local == {"user": "ned"}
+    assert after_expiry is None
+
+
+def test_expired_and_deleted_sessions_are_gone(clock, redis_client):
+    async def run():
+        store = SessionStore(redis_client)
+        await redis_client.set("old", json.dumps({"user": "a"}), px=50)
+        await asyncio.sleep(0.1)
+        expired = await store.get("old")
+        await store.create("s1", {"user": "b"})
+        await store.delete("s1")
+        return expired, await store.get("s1"), await redis_client.exists("s1")
+
+    assert asyncio.run(run()) == (None, None, 0)
+
+
+def test_missing_session_is_not_cached(clock, redis_client):
+    async def run():
+        store = SessionStore(redis_client)
+        missing = await store.get("s1")
+        await redis_client.set("s1", json.dumps({"user": "ned"}))
+        return missing, await store.get("s1")
+
+    assert asyncio.run(run()) == (None, {"user": "ned"})
@@ -1,51 +1,154 @@
 # twitter_feed.py
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from time import monotonic
+
 import tweepy
 from flask import Blueprint, jsonify
 from dotenv import load_dotenv
 
+from metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
 # Load .env
 load_dotenv()
 
 # Load credentials
 BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
 USERNAMES = [u.strip() for u in os.getenv("TWITTER_USERNAMES", "").split(",") if u.strip()]
+TWITTER_POLL_SECONDS = int(os.getenv("TWITTER_POLL_SECONDS", "300"))
+TWEETS_PER_USER = 5
 
 twitter_feed = Blueprint("twitter_feed", __name__)
+logger = logging.getLogger(__name__)
+
+
+class TweetFeed:
+    """Latest tweets for a set of accounts, refreshed in the background.
+
+    Username -> user ID lookups are batched into one get_users call and
+    memoized for good; each refresh then polls every timeline concurrently
+    with since_id, so an unchanged timeline costs one small request.
+    Requests only ever read `cache`, never the API.
+
+    `cache` is a plain dict (user_ids, since_ids, timelines, updated) so it
+    can be saved to and loaded from the snapshot like the other caches;
+    refresh() swaps in new values per key rather than mutating them.
+    """
+
+    def __init__(self, client, usernames, tweets_per_user=TWEETS_PER_USER, max_workers=4):
+        self.client = client
+        self.usernames = list(usernames)
+        self.listed_usernames = list(usernames)  # the accounts tweets() lists by default
+        self.tweets_per_user = tweets_per_user
+        self.cache = {"user_ids": {}, "since_ids": {}, "timelines": {}, "updated": None}
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tweets")
+        self.lock = Lock()
+
+    def follow(self, username):
+        """Poll an extra account, readable with tweets(username) but not in the default listing."""
+        if username.lower() not in (u.lower() for u in self.usernames):
+            self.usernames.append(username)
+
+    def resolve_user_ids(self):
+        user_ids = self.cache["user_ids"]
+        missing = {u.lower(): u for u in self.usernames if u not in user_ids}
+        if not missing:
+            return
+        start = monotonic()
+        try:
+            response = self.client.get_users(usernames=list(missing.values()))
+        except Exception as e:
+            UPSTREAM_ERRORS.inc("twitter")
+            logger.warning("[Twitter] User lookup failed for %s: %s", list(missing.values()), e)
+            return
+        finally:
+            UPSTREAM_LATENCY.observe(monotonic() - start, "twitter")
+        resolved = dict(user_ids)
+        for user in response.data or []:
+            username = missing.get(user.username.lower())
+            if username:
+                resolved[username] = str(user.id)
+        for username in missing.values():
+            if username not in resolved:
+                logger.warning("[Twitter] No user found for %s", username)
+        self.cache["user_ids"] = resolved
+
+    def fetch_timeline(self, username, user_id, since_id):
+        """New tweets (newest first) since `since_id` and the newest ID seen."""
+        kwargs = {"max_results": max(5, self.tweets_per_user), "exclude": ["retweets", "replies"],
+                  "tweet_fields": ["created_at"]}
+        if since_id:
+            kwargs["since_id"] = since_id
+        start = monotonic()
+        try:
+            response = self.client.get_users_tweets(id=user_id, **kwargs)
+        except Exception:
+            UPSTREAM_ERRORS.inc("twitter")
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(monotonic() - start, "twitter")
+        tweets = [{
+            "id": str(t.id),
+            "text": t.text,
+            "user": username,
+            "created_at": t.created_at.isoformat() if t.created_at else None,
+        } for t in response.data or []]
+        newest_id = (response.meta or {}).get("newest_id") or (tweets[0]["id"] if tweets else since_id)
+        return tweets, newest_id
+
+    def refresh(self):
+        """Poll every timeline once; returns True if any new tweets arrived."""
+        with self.lock:
+            self.resolve_user_ids()
+            user_ids = self.cache["user_ids"]
+            since_ids = dict(self.cache["since_ids"])
+            futures = {
+                username: self.pool.submit(self.fetch_timeline, username, user_ids[username],
+                                           since_ids.get(username))
+                for username in self.usernames if username in user_ids
+            }
+            timelines = dict(self.cache["timelines"])
+            changed = False
+            for username, future in futures.items():
+                try:
+                    tweets, newest_id = future.result()
+                except Exception as e:
+                    logger.warning("[Twitter] Timeline fetch failed for %s: %s", username, e)
+                    continue
+                since_ids[username] = newest_id
+                if tweets:
+                    logger.debug("[Twitter] %d new tweets for %s", len(tweets), username)
+                    seen = {t["id"] for t in tweets}
+                    old = [t for t in timelines.get(username, []) if t["id"] not in seen]
+                    timelines[username] = (tweets + old)[:self.tweets_per_user]
+                    changed = True
+            self.cache["since_ids"] = since_ids
+            self.cache["timelines"] = timelines
+            self.cache["updated"] = datetime.utcnow()
+            return changed
+
+    def tweets(self, username=None):
+        timelines = self.cache["timelines"]
+        if username is not None:
+            return list(timelines.get(username, []))
+        return [t for name in self.listed_usernames for t in timelines.get(name, [])]
+
+    def stale(self):
+        updated = self.cache["updated"]
+        return updated is None or datetime.utcnow() - updated > timedelta(seconds=2 * TWITTER_POLL_SECONDS)
+
 
-# Init tweepy
-client = tweepy.Client(bearer_token=BEARER_TOKEN)
+tweet_feed = TweetFeed(tweepy.Client(bearer_token=BEARER_TOKEN), USERNAMES)
 
 
 @twitter_feed.route("/api/tweets")
 def get_recent_tweets():
-    try:
-        print("🐦 Loading tweets for:", USERNAMES)
-        print("📡 Using bearer token:", "✔️" if BEARER_TOKEN else "❌ MISSING")
-
-        all_tweets = []
-
-        for username in USERNAMES:
-            print(f"🔍 Fetching user: {username}")
-            user = client.get_user(username=username)
-            if not user or not user.data:
-                print(f"⚠️ No user found for {username}")
-                continue
-
-            user_id = user.data.id
-            print(f"✅ Found user ID {user_id} for {username}")
-
-            response = client.get_users_tweets(id=user_id, max_results=5, exclude=["retweets", "replies"])
-            if response.data:
-                for tweet in response.data:
-                    print(f"📝 {username}: {tweet.text}")
-                tweets = [{"text": t.text, "user": username} for t in response.data]
-                all_tweets.extend(tweets)
-            else:
-                print(f"⚠️ No tweets found for {username}")
-
-        return jsonify(tweets=all_tweets)
-
-    except Exception as e:
-        print("🔥 ERROR fetching tweets:", e)
-        return jsonify(error=str(e)), 500
+    updated = tweet_feed.cache["updated"]
+    return jsonify(
+        tweets=tweet_feed.tweets(),
+        timestamp=updated.isoformat() if updated else None,
+        stale=tweet_feed.stale(),
+    )